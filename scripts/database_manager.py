@@ -6,11 +6,157 @@ Universal cloud resource mapping database for cost estimation
 
 import sqlite3
 import json
+import math
+import sys
+import functools
+import importlib.util
+import pprint
+from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 import argparse
 
-@dataclass
+# Bulk insert statements used by populate_initial_data, as
+# (prefix, per-row VALUES tuple, suffix) for _multi_insert
+_SQL_INSERT_INSTANCE = (
+    """INSERT INTO instance_types 
+    (provider, instance_type, vcpu, memory_gb, family, generation, 
+     network_performance, storage_type, storage_gb, gpu_count, gpu_type, hourly_price)
+    VALUES """,
+    "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    " ON CONFLICT(provider, instance_type) DO NOTHING",
+)
+
+_SQL_INSERT_REGION = (
+    """INSERT INTO regions 
+    (provider, region_code, region_name, country, continent, latitude, longitude)
+    VALUES """,
+    "(?, ?, ?, ?, ?, ?, ?)",
+    " ON CONFLICT(provider, region_code) DO NOTHING",
+)
+
+_SQL_INSERT_RESOURCE = (
+    """INSERT INTO resource_types 
+    (provider, resource_type, resource_category, terraform_type)
+    VALUES """,
+    "(?, ?, ?, ?)",
+    " ON CONFLICT(provider, terraform_type) DO NOTHING",
+)
+
+_SQL_INSERT_IMAGE = (
+    """INSERT INTO images 
+    (provider, image_name, os_family, os_version, architecture)
+    VALUES """,
+    "(?, ?, ?, ?, 'x86_64')",
+    " ON CONFLICT(provider, image_name) DO NOTHING",
+)
+
+# SQLite's historical default for SQLITE_MAX_VARIABLE_NUMBER
+_MAX_BOUND_PARAMS = 999
+
+# Schema, created in one executescript batch when opening a writable database
+_SCHEMA_DDL = """
+    -- Instance types table - stores all instance types from all providers
+    CREATE TABLE IF NOT EXISTS instance_types (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        provider TEXT NOT NULL,
+        instance_type TEXT NOT NULL,
+        vcpu INTEGER NOT NULL,
+        memory_gb REAL NOT NULL,
+        family TEXT,  -- general, compute, memory, etc
+        generation TEXT,  -- current, previous, etc
+        network_performance TEXT,
+        storage_type TEXT,
+        storage_gb INTEGER,
+        gpu_count INTEGER DEFAULT 0,
+        gpu_type TEXT,
+        hourly_price REAL,  -- optional, for reference
+        notes TEXT,
+        UNIQUE(provider, instance_type)
+    );
+    
+    -- Regions table - stores all regions from all providers
+    CREATE TABLE IF NOT EXISTS regions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        provider TEXT NOT NULL,
+        region_code TEXT NOT NULL,
+        region_name TEXT NOT NULL,
+        country TEXT,
+        continent TEXT,
+        latitude REAL,
+        longitude REAL,
+        UNIQUE(provider, region_code)
+    );
+    
+    -- Resource types mapping table
+    CREATE TABLE IF NOT EXISTS resource_types (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        provider TEXT NOT NULL,
+        resource_type TEXT NOT NULL,
+        resource_category TEXT NOT NULL,  -- compute, storage, network, etc
+        terraform_type TEXT,  -- The actual Terraform resource type
+        UNIQUE(provider, terraform_type)
+    );
+    
+    -- Images/OS mapping table
+    CREATE TABLE IF NOT EXISTS images (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        provider TEXT NOT NULL,
+        image_name TEXT NOT NULL,
+        os_family TEXT NOT NULL,  -- ubuntu, debian, centos, windows, etc
+        os_version TEXT,
+        architecture TEXT DEFAULT 'x86_64',
+        UNIQUE(provider, image_name)
+    );
+"""
+
+# Lookup indexes, created after bulk loads so rows aren't indexed one by one
+_POST_LOAD_DDL = """
+    CREATE INDEX IF NOT EXISTS idx_instance_specs 
+    ON instance_types(vcpu, memory_gb, family);
+    
+    -- Leading provider column lets target-provider spec filters range-scan
+    CREATE INDEX IF NOT EXISTS idx_instance_provider_specs 
+    ON instance_types(provider, vcpu, memory_gb);
+    
+    CREATE INDEX IF NOT EXISTS idx_region_location 
+    ON regions(latitude, longitude);
+    
+    -- Refresh planner statistics so the lookup queries pick up the indexes
+    ANALYZE;
+"""
+
+def _multi_insert(conn: sqlite3.Connection, statement: Tuple[str, str, str], rows: List[tuple]):
+    """Insert rows using multi-row VALUES statements instead of one step per row
+    
+    Rows are chunked so each statement stays under the bound-parameter limit.
+    """
+    prefix, row_sql, suffix = statement
+    chunk_size = max(1, _MAX_BOUND_PARAMS // row_sql.count("?"))
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        sql = prefix + ", ".join([row_sql] * len(chunk)) + suffix
+        conn.execute(sql, [value for row in chunk for value in row])
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """sys.intern that passes NULL columns through"""
+    return sys.intern(value) if value is not None else None
+
+
+def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in km, for ranking regions by proximity
+    
+    Planar approximations go wrong on intercontinental hops (Sydney is closer
+    to Helsinki than to Ashburn), and there are only a few dozen regions.
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    h = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * 6371.0088 * math.asin(min(1.0, math.sqrt(h)))
+
+
+@dataclass(slots=True, frozen=True)
 class InstanceMapping:
     """Represents an instance type mapping between clouds"""
     provider: str
@@ -20,7 +166,7 @@ class InstanceMapping:
     family: str
     generation: str
     
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RegionMapping:
     """Represents a region mapping between clouds"""
     provider: str
@@ -30,92 +176,207 @@ class RegionMapping:
     longitude: float
     
 
-class CloudRosettaDB:
-    """Manages the cloud resource mapping database"""
+class _InMemoryLookups:
+    """Resource type, instance and region lookups over in-memory tables
     
-    def __init__(self, db_path: str = "cloud_rosetta.db"):
-        self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
-        self.conn.row_factory = sqlite3.Row
-        self.cursor = self.conn.cursor()
-        self._create_schema()
+    Shared by CloudRosettaDB (tables loaded from SQLite) and FrozenRosetta
+    (tables from a generated module). The tables hold a few dozen rows per
+    provider (a few thousand resource mappings), so a dict lookup or a match
+    in Python is cheaper than a SQL round-trip per lookup.
+    """
+    
+    def _set_lookup_tables(self, instances: Dict[str, List[Tuple[str, int, float, Optional[str]]]],
+                           regions: Dict[str, List[Tuple[str, float, float, Optional[str]]]]):
+        """Index per-provider instance and region rows and reset the lookup caches"""
+        # family/continent come from a handful of values repeated on every row;
+        # interning makes the per-lookup equality checks identity compares
+        instances = {
+            provider: [(instance_type, vcpu, memory_gb, _intern(family))
+                       for instance_type, vcpu, memory_gb, family in rows]
+            for provider, rows in instances.items()
+        }
+        regions = {
+            provider: [(region_code, latitude, longitude, _intern(continent))
+                       for region_code, latitude, longitude, continent in rows]
+            for provider, rows in regions.items()
+        }
+        
+        self._instances_by_provider = instances
+        self._instance_specs: Dict[Tuple[str, str], Tuple[int, float, Optional[str]]] = {
+            (provider, instance_type): (vcpu, memory_gb, family)
+            for provider, rows in instances.items()
+            for instance_type, vcpu, memory_gb, family in rows
+        }
+        self._region_coords: Dict[Tuple[str, str], Tuple[float, float, Optional[str]]] = {
+            (provider, region_code): (latitude, longitude, continent)
+            for provider, rows in regions.items()
+            for region_code, latitude, longitude, continent in rows
+        }
+        # Column-wise (codes, lats, lons, continents) per provider for the distance scan
+        self._region_columns: Dict[str, Tuple[tuple, tuple, tuple, tuple]] = {
+            provider: tuple(zip(*rows)) for provider, rows in regions.items() if rows
+        }
+        # Row indices per (provider, continent), so a lookup only scans its own continent
+        self._region_buckets: Dict[str, Dict[str, Tuple[int, ...]]] = {}
+        for provider, rows in regions.items():
+            buckets: Dict[str, List[int]] = {}
+            for i, (_, _, _, continent) in enumerate(rows):
+                if continent is not None:
+                    buckets.setdefault(continent, []).append(i)
+            self._region_buckets[provider] = {c: tuple(idx) for c, idx in buckets.items()}
+        
+        # Per-instance lookup caches (lru_cache on the methods would keep every
+        # instance alive); rebuilt whenever the tables change
+        self._instance_cache = functools.lru_cache(maxsize=1024)(self._find_equivalent_instance_uncached)
+        self._region_cache = functools.lru_cache(maxsize=1024)(self._find_nearest_region_uncached)
+    
+    def map_resource_type(self, source_terraform_type: str, target_provider: str) -> Optional[str]:
+        """Map a Terraform resource type to equivalent in target provider"""
+        if target_provider == "aws":
+            # If translating to AWS, return the original
+            return source_terraform_type
+        return self._resource_mappings.get(source_terraform_type, {}).get(target_provider)
+    
+    def find_equivalent_instance(self, source_provider: str, source_type: str, 
+                                target_provider: str) -> Optional[str]:
+        """Find equivalent instance type in target provider"""
+        return self._instance_cache(source_provider, source_type, target_provider)
+    
+    def _find_equivalent_instance_uncached(self, source_provider: str, source_type: str,
+                                           target_provider: str) -> Optional[str]:
+        """Match the source instance against the in-memory instance table"""
         
-    def _create_schema(self):
-        """Create database schema if it doesn't exist"""
+        source = self._instance_specs.get((source_provider, source_type))
+        if not source:
+            return None
         
-        # Instance types table - stores all instance types from all providers
-        self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS instance_types (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                provider TEXT NOT NULL,
-                instance_type TEXT NOT NULL,
-                vcpu INTEGER NOT NULL,
-                memory_gb REAL NOT NULL,
-                family TEXT,  -- general, compute, memory, etc
-                generation TEXT,  -- current, previous, etc
-                network_performance TEXT,
-                storage_type TEXT,
-                storage_gb INTEGER,
-                gpu_count INTEGER DEFAULT 0,
-                gpu_type TEXT,
-                hourly_price REAL,  -- optional, for reference
-                notes TEXT,
-                UNIQUE(provider, instance_type)
-            )
-        """)
+        vcpu, memory_gb, family = source
         
-        # Regions table - stores all regions from all providers
-        self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS regions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                provider TEXT NOT NULL,
-                region_code TEXT NOT NULL,
-                region_name TEXT NOT NULL,
-                country TEXT,
-                continent TEXT,
-                latitude REAL,
-                longitude REAL,
-                UNIQUE(provider, region_code)
-            )
-        """)
+        # Find best match in target provider within half/double the source specs
+        # Priority: same family > closest specs
+        best = None
+        best_key = None
+        for instance_type, t_vcpu, t_memory, t_family in self._instances_by_provider.get(target_provider, ()):
+            if not (vcpu * 0.5 <= t_vcpu <= vcpu * 2 and memory_gb * 0.5 <= t_memory <= memory_gb * 2):
+                continue
+            key = (0 if family is not None and t_family == family else 1,
+                   abs(t_vcpu - vcpu) + abs(t_memory - memory_gb) * 0.5)
+            if best_key is None or key < best_key:
+                best, best_key = instance_type, key
+        
+        return best
+    
+    def find_nearest_region(self, source_provider: str, source_region: str,
+                           target_provider: str) -> Optional[str]:
+        """Find nearest region in target provider based on geographic location"""
+        return self._region_cache(source_provider, source_region, target_provider)
+    
+    def _find_nearest_region_uncached(self, source_provider: str, source_region: str,
+                                      target_provider: str) -> Optional[str]:
+        """Match the source region against the in-memory region table"""
         
-        # Resource types mapping table
-        self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS resource_types (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                provider TEXT NOT NULL,
-                resource_type TEXT NOT NULL,
-                resource_category TEXT NOT NULL,  -- compute, storage, network, etc
-                terraform_type TEXT,  -- The actual Terraform resource type
-                UNIQUE(provider, terraform_type)
-            )
-        """)
+        source = self._region_coords.get((source_provider, source_region))
+        if not source:
+            return None
         
-        # Images/OS mapping table
-        self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS images (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                provider TEXT NOT NULL,
-                image_name TEXT NOT NULL,
-                os_family TEXT NOT NULL,  -- ubuntu, debian, centos, windows, etc
-                os_version TEXT,
-                architecture TEXT DEFAULT 'x86_64',
-                UNIQUE(provider, image_name)
-            )
-        """)
+        lat, lon, continent = source
         
-        # Create indexes for better query performance
-        self.cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_instance_specs 
-            ON instance_types(vcpu, memory_gb, family)
+        columns = self._region_columns.get(target_provider)
+        if not columns:
+            return None
+        codes, lats, lons, _ = columns
+        
+        # Find nearest region in target provider, preferring the same continent
+        candidates = self._region_buckets[target_provider].get(continent) or range(len(codes))
+        
+        best = min(candidates, key=lambda i: _haversine_km(lat, lon, lats[i], lons[i]))
+        return codes[best]
+
+
+class CloudRosettaDB(_InMemoryLookups):
+    """Manages the cloud resource mapping database
+    
+    Pass read_only=True when only doing lookups: the file is opened with
+    mode=ro and the schema DDL is skipped. Callers embedding this class should
+    keep one instance open and reuse it, so the page cache and lookup caches
+    stay warm across calls.
+    """
+    
+    def __init__(self, db_path: str = "cloud_rosetta.db", fast_init: bool = False,
+                 read_only: bool = False):
+        self.db_path = db_path
+        self.fast_init = fast_init  # Skip fsyncs while bulk loading initial data
+        self.read_only = read_only  # Lookups only: no schema DDL, no writes
+        if read_only:
+            # as_uri() percent-escapes '#', '?' and '%' so the path can't be misread
+            self.conn = sqlite3.connect(Path(db_path).resolve().as_uri() + "?mode=ro", uri=True,
+                                        cached_statements=256)
+        else:
+            self.conn = sqlite3.connect(db_path, cached_statements=256)
+        # journal_mode is left alone: WAL is persisted in the file header and
+        # this database is also shipped and opened read-only by the CLI
+        self.conn.executescript("""
+            PRAGMA synchronous=NORMAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA cache_size=-64000;
+            PRAGMA mmap_size=268435456;
         """)
+        if not read_only:
+            self._create_schema()
+        self._load_lookup_tables()
+    
+    def _load_lookup_tables(self):
+        """Load resource mappings, instance types and regions into memory for the lookup methods
+        
+        Rows are kept in the (provider, name) unique-index order the SQL
+        lookups used to scan, so ties resolve to the same match as before.
+        """
+        # Ordered like the (aws_type, ovh_type, hetzner_type) index the
+        # per-call SQL lookup read, so the first row per aws_type is the one
+        # its fetchone() returned
+        try:
+            mapping_rows = self.conn.execute("""
+                SELECT aws_type, ovh_type, hetzner_type
+                FROM resource_mappings
+                WHERE aws_type IS NOT NULL
+                ORDER BY aws_type, ovh_type, hetzner_type, id
+            """).fetchall()
+        except sqlite3.OperationalError:
+            mapping_rows = []  # Databases created by init have no resource_mappings table
+        
+        self._resource_mappings: Dict[str, Dict[str, Optional[str]]] = {}
+        for aws_type, ovh_type, hetzner_type in mapping_rows:
+            self._resource_mappings.setdefault(
+                aws_type, {"ovh": ovh_type or None, "hetzner": hetzner_type or None})
+        
+        instances: Dict[str, List[Tuple[str, int, float, Optional[str]]]] = {}
+        rows = self.conn.execute("""
+            SELECT provider, instance_type, vcpu, memory_gb, family
+            FROM instance_types
+            ORDER BY provider, instance_type
+        """)
+        for provider, instance_type, vcpu, memory_gb, family in rows:
+            instances.setdefault(provider, []).append((instance_type, vcpu, memory_gb, family))
         
-        self.cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_region_location 
-            ON regions(latitude, longitude)
+        regions: Dict[str, List[Tuple[str, float, float, Optional[str]]]] = {}
+        rows = self.conn.execute("""
+            SELECT provider, region_code, latitude, longitude, continent
+            FROM regions
+            WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+            ORDER BY provider, region_code
         """)
+        for provider, region_code, latitude, longitude, continent in rows:
+            regions.setdefault(provider, []).append((region_code, latitude, longitude, continent))
         
-        self.conn.commit()
+        self._set_lookup_tables(instances, regions)
+    
+    def _create_schema(self):
+        """Create database schema if it doesn't exist"""
+        self.conn.executescript(_SCHEMA_DDL)
+    
+    def _create_indexes(self):
+        """Create lookup indexes; called after bulk loads so rows aren't indexed one by one"""
+        self.conn.executescript(_POST_LOAD_DDL)
     
     def populate_initial_data(self):
         """Populate database with initial mappings"""
@@ -190,18 +451,6 @@ class CloudRosettaDB:
             ("hetzner", "cpx41", 8, 16, "general", "current", "20TB", "ssd", 240, 0, None, 0.0438),
         ]
         
-        # Insert instance types
-        for instance in ovh_instances + aws_instances + hetzner_instances:
-            try:
-                self.cursor.execute("""
-                    INSERT OR IGNORE INTO instance_types 
-                    (provider, instance_type, vcpu, memory_gb, family, generation, 
-                     network_performance, storage_type, storage_gb, gpu_count, gpu_type, hourly_price)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, instance)
-            except sqlite3.IntegrityError:
-                pass  # Ignore duplicates
-        
         # Regions
         regions = [
             # OVH regions
@@ -234,16 +483,6 @@ class CloudRosettaDB:
             ("hetzner", "ash", "Ashburn, USA", "USA", "North America", 39.043, -77.487),
         ]
         
-        for region in regions:
-            try:
-                self.cursor.execute("""
-                    INSERT OR IGNORE INTO regions 
-                    (provider, region_code, region_name, country, continent, latitude, longitude)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, region)
-            except sqlite3.IntegrityError:
-                pass
-        
         # Resource type mappings
         resource_types = [
             # OVH/OpenStack
@@ -278,16 +517,6 @@ class CloudRosettaDB:
             ("hetzner", "subnet", "network", "hcloud_network_subnet"),
         ]
         
-        for rt in resource_types:
-            try:
-                self.cursor.execute("""
-                    INSERT OR IGNORE INTO resource_types 
-                    (provider, resource_type, resource_category, terraform_type)
-                    VALUES (?, ?, ?, ?)
-                """, rt)
-            except sqlite3.IntegrityError:
-                pass
-        
         # OS/Image mappings
         images = [
             # OVH
@@ -319,186 +548,231 @@ class CloudRosettaDB:
             ("hetzner", "almalinux-8", "almalinux", "8"),
         ]
         
-        for img in images:
-            try:
-                self.cursor.execute("""
-                    INSERT OR IGNORE INTO images 
-                    (provider, image_name, os_family, os_version, architecture)
-                    VALUES (?, ?, ?, ?, 'x86_64')
-                """, img)
-            except sqlite3.IntegrityError:
-                pass
-        
-        self.conn.commit()
-    
-    def find_equivalent_instance(self, source_provider: str, source_type: str, 
-                                target_provider: str) -> Optional[str]:
-        """Find equivalent instance type in target provider"""
-        
-        # First, get specs of source instance
-        self.cursor.execute("""
-            SELECT vcpu, memory_gb, family 
-            FROM instance_types 
-            WHERE provider = ? AND instance_type = ?
-        """, (source_provider, source_type))
-        
-        source = self.cursor.fetchone()
-        if not source:
-            return None
-        
-        vcpu, memory_gb, family = source
-        
-        # Find best match in target provider
-        # Priority: exact match > same family > closest specs
+        # Load everything in a single transaction; ON CONFLICT handles duplicates,
+        # anything else rolls the whole load back
+        if self.fast_init:
+            self.conn.execute("PRAGMA synchronous=OFF")
         try:
-            self.cursor.execute("""
-                SELECT instance_type,
-                       ABS(vcpu - ?) + ABS(memory_gb - ?) * 0.5 as diff
-                FROM instance_types
-                WHERE provider = ?
-                  AND vcpu >= ? * 0.5 AND vcpu <= ? * 2
-                  AND memory_gb >= ? * 0.5 AND memory_gb <= ? * 2
-                ORDER BY 
-                    CASE WHEN family = ? THEN 0 ELSE 1 END,
-                    diff
-                LIMIT 1
-            """, (vcpu, memory_gb, target_provider, 
-                  vcpu, vcpu, memory_gb, memory_gb, family))
-            
-            result = self.cursor.fetchone()
-            return result[0] if result else None
+            self.conn.execute("BEGIN")
+            _multi_insert(self.conn, _SQL_INSERT_INSTANCE, ovh_instances + aws_instances + hetzner_instances)
+            _multi_insert(self.conn, _SQL_INSERT_REGION, regions)
+            _multi_insert(self.conn, _SQL_INSERT_RESOURCE, resource_types)
+            _multi_insert(self.conn, _SQL_INSERT_IMAGE, images)
+            self.conn.commit()
         except sqlite3.Error:
-            return None
-        except Exception:
-            return None
-    
-    def find_nearest_region(self, source_provider: str, source_region: str,
-                           target_provider: str) -> Optional[str]:
-        """Find nearest region in target provider based on geographic location"""
-        
-        # Get source region coordinates
-        self.cursor.execute("""
-            SELECT latitude, longitude, continent
-            FROM regions
-            WHERE provider = ? AND region_code = ?
-        """, (source_provider, source_region))
-        
-        source = self.cursor.fetchone()
-        if not source:
-            return None
-        
-        lat, lon, continent = source
-        
-        # Find nearest region in target provider
-        # Using simplified distance calculation (good enough for this purpose)
-        self.cursor.execute("""
-            SELECT region_code,
-                   ((latitude - ?) * (latitude - ?) + 
-                    (longitude - ?) * (longitude - ?)) as dist_sq
-            FROM regions
-            WHERE provider = ?
-            ORDER BY 
-                CASE WHEN continent = ? THEN 0 ELSE 1 END,
-                dist_sq
-            LIMIT 1
-        """, (lat, lat, lon, lon, target_provider, continent))
-        
-        result = self.cursor.fetchone()
-        return result[0] if result else None
-    
-    def map_resource_type(self, source_terraform_type: str, target_provider: str) -> Optional[str]:
-        """Map a Terraform resource type to equivalent in target provider"""
-        
-        # Map directly using resource_mappings table
-        if target_provider == "ovh":
-            self.cursor.execute("""
-                SELECT ovh_type
-                FROM resource_mappings
-                WHERE aws_type = ?
-            """, (source_terraform_type,))
-        elif target_provider == "hetzner":
-            self.cursor.execute("""
-                SELECT hetzner_type
-                FROM resource_mappings
-                WHERE aws_type = ?
-            """, (source_terraform_type,))
-        elif target_provider == "aws":
-            # If translating to AWS, return the original
-            return source_terraform_type
-        else:
-            return None
-        
-        result = self.cursor.fetchone()
-        return result[0] if result and result[0] else None
+            self.conn.rollback()
+            raise
+        finally:
+            if self.fast_init:
+                self.conn.execute("PRAGMA synchronous=NORMAL")
+        
+        self._create_indexes()
+        self._load_lookup_tables()
     
     def get_providers(self) -> List[str]:
         """Get list of all providers in database"""
-        self.cursor.execute("SELECT DISTINCT provider FROM instance_types")
-        return [row[0] for row in self.cursor.fetchall()]
+        return [row[0] for row in self.conn.execute("SELECT DISTINCT provider FROM instance_types")]
+    
+    def export_frozen(self, output_path: str):
+        """Write the lookup tables out as a Python module for FrozenRosetta"""
+        
+        regions = {
+            provider: list(zip(*columns)) for provider, columns in self._region_columns.items()
+        }
+        
+        with open(output_path, "w") as f:
+            f.write('"""\nFrozen Cloud Rosetta mappings\n')
+            f.write(f"Generated by database_manager.py export-frozen from {self.db_path}; do not edit\n")
+            f.write('"""\n\n')
+            f.write(f"PROVIDERS = {pprint.pformat(self.get_providers())}\n\n")
+            f.write(f"INSTANCES = {pprint.pformat(self._instances_by_provider, width=100)}\n\n")
+            f.write(f"REGIONS = {pprint.pformat(regions, width=100)}\n\n")
+            f.write(f"RESOURCE_MAPPINGS = {pprint.pformat(self._resource_mappings, width=100)}\n")
     
     def close(self):
         """Close database connection"""
         self.conn.close()
 
 
+class FrozenRosetta(_InMemoryLookups):
+    """Read-only lookups backed by a module written by export-frozen
+    
+    Offers the same lookup API as CloudRosettaDB without opening SQLite, for
+    deployments where the mapping data is fixed at build time.
+    """
+    
+    def __init__(self, module_path: str = "mappings_frozen.py"):
+        self.module_path = module_path
+        spec = importlib.util.spec_from_file_location("mappings_frozen", module_path)
+        if spec is None:
+            raise ImportError(f"not a Python module: {module_path}")
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        
+        self._providers: List[str] = module.PROVIDERS
+        self._resource_mappings: Dict[str, Dict[str, Optional[str]]] = module.RESOURCE_MAPPINGS
+        self._set_lookup_tables(module.INSTANCES, module.REGIONS)
+    
+    def get_providers(self) -> List[str]:
+        """Get list of all providers in the frozen data"""
+        return list(self._providers)
+    
+    def close(self):
+        """Nothing to release; kept for API parity with CloudRosettaDB"""
+
+
+def run_batch(db: CloudRosettaDB, command: str, batch_path: str):
+    """Run many lookups against one open database
+    
+    Each input line is a JSON object with source_provider, source_type and
+    target_provider (map-resource only needs source_type and target_provider).
+    Each output line echoes the object with a "result" key added (null when
+    no mapping is found).
+    """
+    
+    # command -> (required fields, lookup)
+    lookups = {
+        "map-instance": (("source_provider", "source_type", "target_provider"),
+                         lambda q: db.find_equivalent_instance(q["source_provider"], q["source_type"], q["target_provider"])),
+        "map-region": (("source_provider", "source_type", "target_provider"),
+                       lambda q: db.find_nearest_region(q["source_provider"], q["source_type"], q["target_provider"])),
+        "map-resource": (("source_type", "target_provider"),
+                         lambda q: db.map_resource_type(q["source_type"], q["target_provider"])),
+    }
+    fields, lookup = lookups[command]
+    
+    def error(line_no: int, message: str):
+        print(f"Error: line {line_no}: {message}", file=sys.stderr)
+    
+    try:
+        batch_file = sys.stdin if batch_path == "-" else open(batch_path)
+    except OSError as e:
+        # stderr, like the per-line errors: stdout carries only result lines
+        print(f"Error: cannot read batch file {batch_path}: {e}", file=sys.stderr)
+        return
+    
+    try:
+        for line_no, line in enumerate(batch_file, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                query = json.loads(line)
+            except ValueError as e:
+                error(line_no, f"invalid JSON: {e}")
+                continue
+            if not isinstance(query, dict):
+                error(line_no, "expected a JSON object")
+                continue
+            missing = [field for field in fields if field not in query]
+            if missing:
+                error(line_no, f"missing field{'s' if len(missing) > 1 else ''}: {', '.join(missing)}")
+                continue
+            try:
+                query["result"] = lookup(query)
+            except TypeError as e:  # e.g. a list where a string belongs
+                error(line_no, str(e))
+                continue
+            print(json.dumps(query, ensure_ascii=False))
+    finally:
+        if batch_file is not sys.stdin:
+            batch_file.close()
+
+
 def main():
     parser = argparse.ArgumentParser(description="Cloud Rosetta Database Manager")
-    parser.add_argument("command", choices=["init", "map-instance", "map-region", "map-resource", "list-providers"],
+    parser.add_argument("command", choices=["init", "map-instance", "map-region", "map-resource", "list-providers",
+                                            "export-frozen"],
                        help="Command to execute")
     parser.add_argument("--source-provider", help="Source cloud provider")
     parser.add_argument("--source-type", help="Source instance type or region")
     parser.add_argument("--target-provider", help="Target cloud provider")
     parser.add_argument("--db", default="cloud_rosetta.db", help="Database file path")
+    parser.add_argument("--batch", metavar="FILE",
+                       help="JSONL file ('-' for stdin) of lookups to run with map-instance, map-region or map-resource")
+    parser.add_argument("--output", default="mappings_frozen.py",
+                       help="Module path written by export-frozen")
+    parser.add_argument("--frozen", metavar="MODULE",
+                       help="Serve lookups from a module written by export-frozen instead of the database")
     
     args = parser.parse_args()
     
-    db = CloudRosettaDB(args.db)
+    if args.frozen:
+        if args.command in ("init", "export-frozen"):
+            print("Error: --frozen only supports lookup commands")
+            return
+        try:
+            db = FrozenRosetta(args.frozen)
+        except (OSError, ImportError) as e:
+            print(f"Error: cannot load frozen mappings {args.frozen}: {e}")
+            return
+    else:
+        # Only init writes; lookups open the database read-only and skip the schema DDL
+        try:
+            db = CloudRosettaDB(args.db, fast_init=args.command == "init",
+                                read_only=args.command != "init")
+        except sqlite3.Error as e:
+            print(f"Error: cannot open database {args.db}: {e}")
+            return
     
-    if args.command == "init":
-        print("Initializing Cloud Rosetta database...")
-        db.populate_initial_data()
-        print("Done: Database initialized with mappings for OVH, AWS, and Hetzner")
-        
-    elif args.command == "list-providers":
-        providers = db.get_providers()
-        print("Available cloud providers:")
-        for provider in providers:
-            print(f"  • {provider}")
+    # Every path below, including the early returns, closes the database
+    try:
+        if args.batch:
+            if args.command not in ("map-instance", "map-region", "map-resource"):
+                print("Error: --batch requires map-instance, map-region or map-resource")
+            else:
+                run_batch(db, args.command, args.batch)
+        
+        elif args.command == "init":
+            print("Initializing Cloud Rosetta database...")
+            db.populate_initial_data()
+            print("Done: Database initialized with mappings for OVH, AWS, and Hetzner")
+        
+        elif args.command == "export-frozen":
+            db.export_frozen(args.output)
+            print(f"Done: Frozen mappings written to {args.output}")
+        
+        elif args.command == "list-providers":
+            providers = db.get_providers()
+            print("Available cloud providers:")
+            for provider in providers:
+                print(f"  • {provider}")
             
-    elif args.command == "map-instance":
-        if not all([args.source_provider, args.source_type, args.target_provider]):
-            print("Error: --source-provider, --source-type, and --target-provider required")
-            return
-        
-        result = db.find_equivalent_instance(args.source_provider, args.source_type, args.target_provider)
-        if result:
-            print(f"{args.source_provider} {args.source_type} → {args.target_provider} {result}")
-        else:
-            print(f"No mapping found for {args.source_provider} {args.source_type}")
+        elif args.command == "map-instance":
+            if not all([args.source_provider, args.source_type, args.target_provider]):
+                print("Error: --source-provider, --source-type, and --target-provider required")
+                return
+        
+            result = db.find_equivalent_instance(args.source_provider, args.source_type, args.target_provider)
+            if result:
+                print(f"{args.source_provider} {args.source_type} → {args.target_provider} {result}")
+            else:
+                print(f"No mapping found for {args.source_provider} {args.source_type}")
             
-    elif args.command == "map-region":
-        if not all([args.source_provider, args.source_type, args.target_provider]):
-            print("Error: --source-provider, --source-type (region), and --target-provider required")
-            return
-        
-        result = db.find_nearest_region(args.source_provider, args.source_type, args.target_provider)
-        if result:
-            print(f"{args.source_provider} {args.source_type} → {args.target_provider} {result}")
-        else:
-            print(f"No mapping found for {args.source_provider} {args.source_type}")
+        elif args.command == "map-region":
+            if not all([args.source_provider, args.source_type, args.target_provider]):
+                print("Error: --source-provider, --source-type (region), and --target-provider required")
+                return
+        
+            result = db.find_nearest_region(args.source_provider, args.source_type, args.target_provider)
+            if result:
+                print(f"{args.source_provider} {args.source_type} → {args.target_provider} {result}")
+            else:
+                print(f"No mapping found for {args.source_provider} {args.source_type}")
             
-    elif args.command == "map-resource":
-        if not all([args.source_type, args.target_provider]):
-            print("Error: --source-type (terraform type) and --target-provider required")
-            return
-        
-        result = db.map_resource_type(args.source_type, args.target_provider)
-        if result:
-            print(f"{args.source_type} → {result}")
-        else:
-            print(f"No mapping found for {args.source_type}")
+        elif args.command == "map-resource":
+            if not all([args.source_type, args.target_provider]):
+                print("Error: --source-type (terraform type) and --target-provider required")
+                return
+        
+            result = db.map_resource_type(args.source_type, args.target_provider)
+            if result:
+                print(f"{args.source_type} → {result}")
+            else:
+                print(f"No mapping found for {args.source_type}")
     
-    db.close()
+    finally:
+        db.close()
 
 
 if __name__ == "__main__":
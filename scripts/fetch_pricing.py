@@ -5,52 +5,157 @@ Fetches pricing data from various cloud providers
 """
 
 import json
+import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Sequence
 import logging
 
+try:
+    import orjson  # Optional: faster JSON encode/decode when installed
+except ImportError:
+    orjson = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+HETZNER_PRICING_URL = 'https://api.hetzner.cloud/v1/pricing'
+# The only parts of the Hetzner pricing document fetch_hetzner_pricing reads
+_HETZNER_PRICING_FIELDS = ("pricing.server_types", "pricing.volume")
+
+# Pricing changes on the order of days, so cached API responses stay valid for a day
+DEFAULT_CACHE_DIR = os.path.expanduser("~/.rosetta/pricing_cache")
+DEFAULT_CACHE_TTL = 86400
+
+# Static price tables; fetchers return shallow copies with a fresh updated_at,
+# so callers must treat the nested dicts as read-only
+_AWS_STATIC_PRICING = {
+    "instances": {
+        "t3.nano": {"price": 0.0052, "vcpu": 2, "memory": 0.5},
+        "t3.micro": {"price": 0.0104, "vcpu": 2, "memory": 1},
+        "t3.small": {"price": 0.0208, "vcpu": 2, "memory": 2},
+        "t3.medium": {"price": 0.0416, "vcpu": 2, "memory": 4},
+        "t3.large": {"price": 0.0832, "vcpu": 2, "memory": 8},
+        "m5.large": {"price": 0.096, "vcpu": 2, "memory": 8},
+        "m5.xlarge": {"price": 0.192, "vcpu": 4, "memory": 16},
+        "m5.2xlarge": {"price": 0.384, "vcpu": 8, "memory": 32},
+        "c5.large": {"price": 0.085, "vcpu": 2, "memory": 4},
+        "c5.xlarge": {"price": 0.17, "vcpu": 4, "memory": 8},
+        "r5.large": {"price": 0.126, "vcpu": 2, "memory": 16},
+        "r5.xlarge": {"price": 0.252, "vcpu": 4, "memory": 32},
+    },
+    "storage": {
+        "gp2": {"price_per_gb": 0.10},
+        "gp3": {"price_per_gb": 0.08},
+        "io1": {"price_per_gb": 0.125, "iops_price": 0.065},
+    }
+}
+
+_OVH_STATIC_PRICING = {
+    "instances": {
+        # d2 series (discovery/flex)
+        "d2-2": {"price": 0.0084, "vcpu": 1, "memory": 2},
+        "d2-4": {"price": 0.0168, "vcpu": 2, "memory": 4},
+        "d2-8": {"price": 0.0337, "vcpu": 4, "memory": 8},
+        
+        # b2 series (balanced)
+        "b2-7": {"price": 0.0278, "vcpu": 2, "memory": 7},
+        "b2-15": {"price": 0.0556, "vcpu": 4, "memory": 15},
+        "b2-30": {"price": 0.1111, "vcpu": 8, "memory": 30},
+        "b2-60": {"price": 0.2222, "vcpu": 16, "memory": 60},
+        
+        # c2 series (compute)
+        "c2-7": {"price": 0.0417, "vcpu": 2, "memory": 7},
+        "c2-15": {"price": 0.0833, "vcpu": 4, "memory": 15},
+        "c2-30": {"price": 0.1667, "vcpu": 8, "memory": 30},
+        
+        # r2 series (memory)
+        "r2-15": {"price": 0.0556, "vcpu": 2, "memory": 15},
+        "r2-30": {"price": 0.1111, "vcpu": 4, "memory": 30},
+        "r2-60": {"price": 0.2222, "vcpu": 8, "memory": 60},
+    },
+    "storage": {
+        "classic": {"price_per_gb": 0.04},
+        "high-speed": {"price_per_gb": 0.16},
+    }
+}
+
+_HETZNER_FALLBACK_PRICING = {
+    "instances": {
+        "cx11": {"price": 0.0052, "vcpu": 1, "memory": 2},
+        "cx21": {"price": 0.0089, "vcpu": 2, "memory": 4},
+        "cx31": {"price": 0.0137, "vcpu": 2, "memory": 8},
+        "cx41": {"price": 0.0274, "vcpu": 4, "memory": 16},
+        "cx51": {"price": 0.0548, "vcpu": 8, "memory": 32},
+        
+        "cpx11": {"price": 0.0068, "vcpu": 2, "memory": 2},
+        "cpx21": {"price": 0.0116, "vcpu": 3, "memory": 4},
+        "cpx31": {"price": 0.0219, "vcpu": 4, "memory": 8},
+        "cpx41": {"price": 0.0438, "vcpu": 8, "memory": 16},
+    },
+    "storage": {
+        "volume": {"price_per_gb_month": 0.0476}
+    }
+}
+
+def _select_fields(data: Dict[str, Any], fields: Sequence[str]) -> Dict[str, Any]:
+    """Copy only the given dotted paths out of a parsed JSON document"""
+    selected: Dict[str, Any] = {}
+    for field in fields:
+        *parents, leaf = field.split(".")
+        source, target = data, selected
+        for key in parents:
+            source = source.get(key) if isinstance(source, dict) else None
+            target = target.setdefault(key, {})
+        if isinstance(source, dict) and leaf in source:
+            target[leaf] = source[leaf]
+    return selected
+
 class PricingFetcher:
     def __init__(self):
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'cloud-rosetta-pricing-fetcher/1.0'
         })
+        # Reuse connections and retry transient gateway errors with backoff.
+        # Only those statuses are retried: connect/read failures (offline, DNS)
+        # go straight to the caller's fallback instead of sleeping first.
+        retry = Retry(total=3, connect=0, read=0, status=3, backoff_factor=0.3,
+                      status_forcelist=(502, 503, 504))
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+        self.session.mount('https://', adapter)
+    
+    def _get_json(self, cache_key: str, url: str, fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """GET a JSON document; cache_key identifies it for caching subclasses
+        
+        When fields is given only those dotted paths are kept, so the rest
+        of the document can be freed straight after parsing.
+        """
+        response = self.session.get(url)
+        response.raise_for_status()
+        return self._parse_json(response, fields)
+    
+    @staticmethod
+    def _parse_json(response, fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        if orjson is not None:
+            data = orjson.loads(response.content)
+        else:
+            data = response.json()
+        return _select_fields(data, fields) if fields else data
     
-    def fetch_aws_pricing(self) -> Dict[str, Any]:
+    def fetch_aws_pricing(self, now: Optional[str] = None) -> Dict[str, Any]:
         """Fetch AWS pricing data"""
         logger.info("Fetching AWS pricing data...")
         
         try:
             # AWS EC2 pricing (simplified - real implementation would use AWS API)
             # For now, we'll use Infracost's pricing data format
-            aws_pricing = {
-                "instances": {
-                    "t3.nano": {"price": 0.0052, "vcpu": 2, "memory": 0.5},
-                    "t3.micro": {"price": 0.0104, "vcpu": 2, "memory": 1},
-                    "t3.small": {"price": 0.0208, "vcpu": 2, "memory": 2},
-                    "t3.medium": {"price": 0.0416, "vcpu": 2, "memory": 4},
-                    "t3.large": {"price": 0.0832, "vcpu": 2, "memory": 8},
-                    "m5.large": {"price": 0.096, "vcpu": 2, "memory": 8},
-                    "m5.xlarge": {"price": 0.192, "vcpu": 4, "memory": 16},
-                    "m5.2xlarge": {"price": 0.384, "vcpu": 8, "memory": 32},
-                    "c5.large": {"price": 0.085, "vcpu": 2, "memory": 4},
-                    "c5.xlarge": {"price": 0.17, "vcpu": 4, "memory": 8},
-                    "r5.large": {"price": 0.126, "vcpu": 2, "memory": 16},
-                    "r5.xlarge": {"price": 0.252, "vcpu": 4, "memory": 32},
-                },
-                "storage": {
-                    "gp2": {"price_per_gb": 0.10},
-                    "gp3": {"price_per_gb": 0.08},
-                    "io1": {"price_per_gb": 0.125, "iops_price": 0.065},
-                },
-                "updated_at": datetime.now().isoformat()
-            }
+            aws_pricing = {**_AWS_STATIC_PRICING, "updated_at": now or datetime.now().isoformat()}
             
             logger.info(f"Fetched {len(aws_pricing['instances'])} AWS instance types")
             return aws_pricing
@@ -59,7 +164,7 @@ class PricingFetcher:
             logger.error(f"Failed to fetch AWS pricing: {e}")
             return {"instances": {}, "storage": {}}
     
-    def fetch_ovh_pricing(self) -> Dict[str, Any]:
+    def fetch_ovh_pricing(self, now: Optional[str] = None) -> Dict[str, Any]:
         """Fetch OVH pricing data"""
         logger.info("Fetching OVH pricing data...")
         
@@ -68,35 +173,7 @@ class PricingFetcher:
             # In a real implementation, you might scrape their pricing pages
             # or use their private APIs if you have access
             
-            ovh_pricing = {
-                "instances": {
-                    # d2 series (discovery/flex)
-                    "d2-2": {"price": 0.0084, "vcpu": 1, "memory": 2},
-                    "d2-4": {"price": 0.0168, "vcpu": 2, "memory": 4},
-                    "d2-8": {"price": 0.0337, "vcpu": 4, "memory": 8},
-                    
-                    # b2 series (balanced)
-                    "b2-7": {"price": 0.0278, "vcpu": 2, "memory": 7},
-                    "b2-15": {"price": 0.0556, "vcpu": 4, "memory": 15},
-                    "b2-30": {"price": 0.1111, "vcpu": 8, "memory": 30},
-                    "b2-60": {"price": 0.2222, "vcpu": 16, "memory": 60},
-                    
-                    # c2 series (compute)
-                    "c2-7": {"price": 0.0417, "vcpu": 2, "memory": 7},
-                    "c2-15": {"price": 0.0833, "vcpu": 4, "memory": 15},
-                    "c2-30": {"price": 0.1667, "vcpu": 8, "memory": 30},
-                    
-                    # r2 series (memory)
-                    "r2-15": {"price": 0.0556, "vcpu": 2, "memory": 15},
-                    "r2-30": {"price": 0.1111, "vcpu": 4, "memory": 30},
-                    "r2-60": {"price": 0.2222, "vcpu": 8, "memory": 60},
-                },
-                "storage": {
-                    "classic": {"price_per_gb": 0.04},
-                    "high-speed": {"price_per_gb": 0.16},
-                },
-                "updated_at": datetime.now().isoformat()
-            }
+            ovh_pricing = {**_OVH_STATIC_PRICING, "updated_at": now or datetime.now().isoformat()}
             
             logger.info(f"Fetched {len(ovh_pricing['instances'])} OVH instance types")
             return ovh_pricing
@@ -105,22 +182,19 @@ class PricingFetcher:
             logger.error(f"Failed to fetch OVH pricing: {e}")
             return {"instances": {}, "storage": {}}
     
-    def fetch_hetzner_pricing(self) -> Dict[str, Any]:
+    def fetch_hetzner_pricing(self, now: Optional[str] = None) -> Dict[str, Any]:
         """Fetch Hetzner pricing data using their API"""
         logger.info("Fetching Hetzner pricing data...")
         
         try:
             # Hetzner has a public API for pricing
-            response = self.session.get('https://api.hetzner.cloud/v1/pricing')
-            response.raise_for_status()
-            
-            data = response.json()
+            data = self._get_json("hetzner:pricing:v1", HETZNER_PRICING_URL, _HETZNER_PRICING_FIELDS)
             pricing = data.get('pricing', {})
             
             hetzner_pricing = {
                 "instances": {},
                 "storage": {},
-                "updated_at": datetime.now().isoformat()
+                "updated_at": now or datetime.now().isoformat()
             }
             
             # Parse server types pricing
@@ -145,75 +219,181 @@ class PricingFetcher:
         except Exception as e:
             logger.error(f"Failed to fetch Hetzner pricing: {e}")
             # Fallback to hardcoded prices
-            return {
-                "instances": {
-                    "cx11": {"price": 0.0052, "vcpu": 1, "memory": 2},
-                    "cx21": {"price": 0.0089, "vcpu": 2, "memory": 4},
-                    "cx31": {"price": 0.0137, "vcpu": 2, "memory": 8},
-                    "cx41": {"price": 0.0274, "vcpu": 4, "memory": 16},
-                    "cx51": {"price": 0.0548, "vcpu": 8, "memory": 32},
-                    
-                    "cpx11": {"price": 0.0068, "vcpu": 2, "memory": 2},
-                    "cpx21": {"price": 0.0116, "vcpu": 3, "memory": 4},
-                    "cpx31": {"price": 0.0219, "vcpu": 4, "memory": 8},
-                    "cpx41": {"price": 0.0438, "vcpu": 8, "memory": 16},
-                },
-                "storage": {
-                    "volume": {"price_per_gb_month": 0.0476}
-                },
-                "updated_at": datetime.now().isoformat()
-            }
+            return {**_HETZNER_FALLBACK_PRICING, "updated_at": now or datetime.now().isoformat()}
     
     def fetch_all_pricing(self) -> Dict[str, Any]:
         """Fetch pricing from all providers"""
         logger.info("Fetching pricing from all cloud providers...")
         
-        all_pricing = {
-            "aws": self.fetch_aws_pricing(),
-            "ovh": self.fetch_ovh_pricing(), 
-            "hetzner": self.fetch_hetzner_pricing(),
-            "metadata": {
-                "fetched_at": datetime.now().isoformat(),
-                "version": "1.0.0"
+        # One timestamp for the whole batch, so fetched_at matches each updated_at
+        now = datetime.now().isoformat()
+        
+        # Fetch concurrently so total latency is the slowest provider, not the sum
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            aws = executor.submit(self.fetch_aws_pricing, now)
+            ovh = executor.submit(self.fetch_ovh_pricing, now)
+            hetzner = executor.submit(self.fetch_hetzner_pricing, now)
+            
+            all_pricing = {
+                "aws": aws.result(),
+                "ovh": ovh.result(), 
+                "hetzner": hetzner.result(),
+                "metadata": {
+                    "fetched_at": now,
+                    "version": "1.0.0"
+                }
             }
-        }
         
         return all_pricing
     
     def save_pricing_data(self, pricing_data: Dict[str, Any], filename: str = "pricing_data.json"):
         """Save pricing data to file"""
-        with open(filename, 'w') as f:
-            json.dump(pricing_data, f, indent=2)
+        if orjson is not None:
+            with open(filename, 'wb') as f:
+                f.write(orjson.dumps(pricing_data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(filename, 'w') as f:
+                json.dump(pricing_data, f, indent=2)
         logger.info(f"Pricing data saved to {filename}")
 
 
+class CachedPricingFetcher(PricingFetcher):
+    """PricingFetcher that caches API responses in memory and on disk with a TTL
+    
+    Each sidecar file holds the last response body with its ETag and
+    Last-Modified headers. Once the TTL expires the request is sent as a
+    conditional GET, and a 304 reuses the stored body. Any error reading or
+    writing the cache falls back to a live fetch.
+    """
+    
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, ttl: int = DEFAULT_CACHE_TTL):
+        super().__init__()
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._memory_cache: Dict[str, Dict[str, Any]] = {}
+    
+    def _cache_path(self, cache_key: str) -> str:
+        return os.path.join(self.cache_dir, cache_key.replace(":", "_") + ".json")
+    
+    def _read_sidecar(self, path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path) as f:
+                cached = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.debug(f"Pricing cache unavailable at {path}: {e}")
+            return None
+        return cached if isinstance(cached, dict) and "body" in cached else None
+    
+    def _write_sidecar(self, path: str, cached: Dict[str, Any]):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(cached, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write pricing cache {path}: {e}")
+    
+    def _get_json(self, cache_key: str, url: str, fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        if cache_key in self._memory_cache:
+            self.hits += 1
+            logger.info(f"Pricing cache hit (memory) for {cache_key} [hits={self.hits} misses={self.misses}]")
+            return self._memory_cache[cache_key]
+        
+        path = self._cache_path(cache_key)
+        cached = self._read_sidecar(path)
+        if cached is not None:
+            try:
+                fresh = time.time() - os.path.getmtime(path) < self.ttl
+            except OSError:
+                fresh = False
+            if fresh:
+                self.hits += 1
+                logger.info(f"Pricing cache hit for {cache_key} [hits={self.hits} misses={self.misses}]")
+                self._memory_cache[cache_key] = cached["body"]
+                return cached["body"]
+        
+        headers = {}
+        if cached is not None:
+            if cached.get("etag"):
+                headers['If-None-Match'] = cached["etag"]
+            if cached.get("last_modified"):
+                headers['If-Modified-Since'] = cached["last_modified"]
+        
+        response = self.session.get(url, headers=headers)
+        if response.status_code == 304 and cached is not None:
+            self.hits += 1
+            logger.info(f"Pricing cache revalidated for {cache_key} [hits={self.hits} misses={self.misses}]")
+            try:
+                os.utime(path)  # Restart the TTL
+            except OSError as e:
+                logger.warning(f"Failed to refresh pricing cache {path}: {e}")
+            self._memory_cache[cache_key] = cached["body"]
+            return cached["body"]
+        
+        response.raise_for_status()
+        self.misses += 1
+        logger.info(f"Pricing cache miss for {cache_key} [hits={self.hits} misses={self.misses}]")
+        # Cache only the selected fields, which keeps the sidecar small too
+        data = self._parse_json(response, fields)
+        self._memory_cache[cache_key] = data
+        self._write_sidecar(path, {
+            "etag": response.headers.get('ETag'),
+            "last_modified": response.headers.get('Last-Modified'),
+            "body": data,
+        })
+        
+        return data
+
 def main():
     """Main function for CLI usage"""
     import argparse
     
     parser = argparse.ArgumentParser(description="Fetch cloud provider pricing data")
-    parser.add_argument("--provider", choices=["aws", "ovh", "hetzner", "all"], 
-                       default="all", help="Which provider to fetch")
+    parser.add_argument("--provider", default="all",
+                       help="Which provider to fetch: aws, ovh, hetzner, a comma-separated list, or all")
     parser.add_argument("--output", default="pricing_data.json", 
                        help="Output file path")
     parser.add_argument("--verbose", "-v", action="store_true",
                        help="Enable verbose logging")
+    parser.add_argument("--no-cache", action="store_true",
+                       help="Always fetch live instead of using cached API responses")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                       help="Directory for cached API responses")
+    parser.add_argument("--cache-ttl", type=int, default=DEFAULT_CACHE_TTL,
+                       help="Seconds before a cached API response expires")
     
     args = parser.parse_args()
     
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
     
-    fetcher = PricingFetcher()
+    if args.no_cache:
+        fetcher = PricingFetcher()
+    else:
+        fetcher = CachedPricingFetcher(args.cache_dir, args.cache_ttl)
+    
+    dispatch = {
+        "aws": fetcher.fetch_aws_pricing,
+        "ovh": fetcher.fetch_ovh_pricing,
+        "hetzner": fetcher.fetch_hetzner_pricing,
+    }
     
     if args.provider == "all":
         pricing_data = fetcher.fetch_all_pricing()
-    elif args.provider == "aws":
-        pricing_data = {"aws": fetcher.fetch_aws_pricing()}
-    elif args.provider == "ovh":
-        pricing_data = {"ovh": fetcher.fetch_ovh_pricing()}
-    elif args.provider == "hetzner":
-        pricing_data = {"hetzner": fetcher.fetch_hetzner_pricing()}
+    else:
+        providers = list(dict.fromkeys(p.strip() for p in args.provider.split(",") if p.strip()))
+        unknown = [p for p in providers if p not in dispatch]
+        if unknown or not providers:
+            parser.error(f"unknown provider {args.provider!r} "
+                         f"(choose from {', '.join(dispatch)}, all)")
+        
+        now = datetime.now().isoformat()
+        with ThreadPoolExecutor(max_workers=len(providers)) as executor:
+            futures = {p: executor.submit(dispatch[p], now) for p in providers}
+            pricing_data = {p: future.result() for p, future in futures.items()}
     
     fetcher.save_pricing_data(pricing_data, args.output)
     
@@ -3,105 +3,221 @@
 Generate database statistics for releases
 """
 
+import io
+import os
 import sqlite3
+import sys
 import json
-from datetime import datetime
+from collections import defaultdict
+from itertools import islice
+from datetime import date, datetime
 from pathlib import Path
+from typing import Optional, TextIO
 
-def generate_stats(db_path: str = "db/cloud_rosetta.db") -> str:
-    """Generate markdown stats for the database"""
+def _sample_instance_mappings(conn: sqlite3.Connection):
+    """Yield (aws, ovh, hetzner, vcpu, memory_gb) rows for AWS instances with similar specs elsewhere
+    
+    Walks the AWS instances and probes each target provider with an index range
+    lookup, producing the same rows in the same order as a LEFT JOIN of the three
+    providers but only doing the work for the rows actually consumed.
+    """
+    similar_query = """
+        SELECT instance_type
+        FROM instance_types
+        WHERE provider = ?
+          AND vcpu BETWEEN ? AND ?
+          AND memory_gb BETWEEN ? AND ?
+        ORDER BY instance_type
+    """
+    aws_instances = conn.execute("""
+        SELECT instance_type, vcpu, memory_gb
+        FROM instance_types
+        WHERE provider = 'aws'
+        ORDER BY instance_type
+    """)
+    
+    for aws, vcpu, memory in aws_instances:
+        bounds = (vcpu - 1, vcpu + 1, memory - 2, memory + 2)
+        ovh_matches = [row[0] for row in conn.execute(similar_query, ('ovh', *bounds))]
+        hetzner_matches = [row[0] for row in conn.execute(similar_query, ('hetzner', *bounds))]
+        if not ovh_matches and not hetzner_matches:
+            continue
+        
+        for ovh in ovh_matches or [None]:
+            for hetzner in hetzner_matches or [None]:
+                yield aws, ovh, hetzner, vcpu, memory
+
+
+STATS_CACHE_NAME = ".stats_cache.md"
+
+
+def _stats_cache_header(db_path: str) -> str:
+    """Header line identifying the database state a cached report was built from
+    
+    Today's date is part of the key because the Recent Updates section counts
+    pricing rows effective today.
+    """
+    st = os.stat(db_path)
+    return f"<!-- key={Path(db_path).name}:{st.st_mtime_ns}:{st.st_size}:{date.today()} -->\n"
+
+
+def _read_stats_cache(db_path: str) -> Optional[str]:
+    cache_path = Path(db_path).with_name(STATS_CACHE_NAME)
+    try:
+        with open(cache_path) as f:
+            if f.readline() != _stats_cache_header(db_path):
+                return None
+            return f.read()
+    except OSError:
+        return None
+
+
+def _write_stats_cache(db_path: str, markdown: str):
+    cache_path = Path(db_path).with_name(STATS_CACHE_NAME)
+    tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+    try:
+        with open(tmp_path, 'w') as f:
+            f.write(_stats_cache_header(db_path))
+            f.write(markdown)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Warning: could not write stats cache {cache_path}: {e}", file=sys.stderr)
+
+
+def generate_stats(db_path: str = "db/cloud_rosetta.db", out: Optional[TextIO] = None,
+                   use_cache: bool = True) -> Optional[str]:
+    """Generate markdown stats for the database
+    
+    The markdown is written to out when it is given; otherwise it is
+    returned as a string. With use_cache, the part of the report built from
+    the database is saved next to it and reused while the file's mtime and
+    size are unchanged; the Generated line is always current.
+    """
+    
+    if out is None:
+        buf = io.StringIO()
+        generate_stats(db_path, buf, use_cache)
+        return buf.getvalue()
     
     if not Path(db_path).exists():
-        return "# Database Statistics\n\nDatabase not found."
+        out.write("# Database Statistics\n\nDatabase not found.\n")
+        return None
     
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    out.write("# Cloud Rosetta Database Statistics\n")
+    out.write(f"\n**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')}\n")
+    
+    if not use_cache:
+        _write_stats(db_path, out)
+        return None
+    
+    markdown = _read_stats_cache(db_path)
+    if markdown is None:
+        buf = io.StringIO()
+        _write_stats(db_path, buf)
+        markdown = buf.getvalue()
+        _write_stats_cache(db_path, markdown)
+    out.write(markdown)
+    return None
+
+
+def _write_stats(db_path: str, out: TextIO):
+    """Write the database-derived part of the report (after the Generated line) to out"""
     
-    stats = []
-    stats.append("# Cloud Rosetta Database Statistics")
-    stats.append(f"\n**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')}")
+    def emit(line: str):
+        out.write(line)
+        out.write("\n")
+    
+    # Stats generation never writes: open read-only and memory-map the file
+    # (as_uri() percent-escapes '#', '?' and '%' in the path)
+    conn = sqlite3.connect(Path(db_path).resolve().as_uri() + "?mode=ro", uri=True)
+    conn.executescript("""
+        PRAGMA mmap_size=268435456;
+        PRAGMA cache_size=-64000;
+        PRAGMA temp_store=MEMORY;
+    """)
+    # Read everything from one snapshot
+    conn.execute("BEGIN")
+    cursor = conn.cursor()
     
     # Get database version
     try:
         cursor.execute("SELECT version, updated_at FROM db_version ORDER BY id DESC LIMIT 1")
         version_info = cursor.fetchone()
         if version_info:
-            stats.append(f"**Database Version:** {version_info[0]}")
-            stats.append(f"**Last Updated:** {version_info[1]}")
+            emit(f"**Database Version:** {version_info[0]}")
+            emit(f"**Last Updated:** {version_info[1]}")
     except:
-        stats.append("**Database Version:** Unknown")
-    
-    # Resource mappings count
-    cursor.execute("SELECT COUNT(*) FROM resource_mappings")
-    resource_count = cursor.fetchone()[0]
-    stats.append(f"\n## Resource Mappings: {resource_count}")
+        emit("**Database Version:** Unknown")
     
-    # Break down by category
+    # All counts in one compound query, split back out by kind. The
+    # breakdown rows come back as ready-made markdown lines.
     cursor.execute("""
-        SELECT resource_category, COUNT(*) 
-        FROM resource_mappings 
-        GROUP BY resource_category 
-        ORDER BY COUNT(*) DESC
+        SELECT 'mappings', NULL, NULL, COUNT(*) FROM resource_mappings
+        UNION ALL
+        SELECT 'mapping_category',
+               '- **' || UPPER(SUBSTR(resource_category, 1, 1)) || SUBSTR(resource_category, 2)
+                   || '**: ' || COUNT(*) || ' resources',
+               NULL, COUNT(*)
+        FROM resource_mappings GROUP BY resource_category
+        UNION ALL
+        SELECT 'instances', NULL, NULL, COUNT(*) FROM instance_types
+        UNION ALL
+        SELECT 'instance_provider',
+               '- **' || UPPER(provider) || '**: ' || COUNT(*) || ' instance types',
+               NULL, COUNT(*)
+        FROM instance_types GROUP BY provider
+        UNION ALL
+        SELECT 'regions', NULL, NULL, COUNT(*) FROM regions
+        UNION ALL
+        SELECT 'region_provider',
+               '- **' || UPPER(provider) || '**: ' || COUNT(*) || ' regions',
+               NULL, COUNT(*)
+        FROM regions GROUP BY provider
+        UNION ALL
+        SELECT 'images', NULL, NULL, COUNT(*) FROM images
+        UNION ALL
+        SELECT 'family', family, provider, COUNT(*)
+        FROM instance_types WHERE family IS NOT NULL GROUP BY family, provider
     """)
     
-    stats.append("\n### By Category:")
-    for category, count in cursor.fetchall():
-        stats.append(f"- **{category.title()}**: {count} resources")
+    counts = defaultdict(list)
+    for kind, key, subkey, count in cursor:
+        counts[kind].append((key, subkey, count))
+    
+    # Resource mappings count
+    emit(f"\n## Resource Mappings: {counts['mappings'][0][2]}")
+    
+    # Break down by category
+    emit("\n### By Category:")
+    for line, _, _ in sorted(counts['mapping_category'], key=lambda row: -row[2]):
+        emit(line)
     
     # Instance types count
-    cursor.execute("SELECT COUNT(*) FROM instance_types")
-    instance_count = cursor.fetchone()[0]
-    stats.append(f"\n## Instance Types: {instance_count}")
+    emit(f"\n## Instance Types: {counts['instances'][0][2]}")
     
     # Break down by provider
-    cursor.execute("""
-        SELECT provider, COUNT(*) 
-        FROM instance_types 
-        GROUP BY provider 
-        ORDER BY provider
-    """)
-    
-    stats.append("\n### By Provider:")
-    for provider, count in cursor.fetchall():
-        stats.append(f"- **{provider.upper()}**: {count} instance types")
+    emit("\n### By Provider:")
+    for line, _, _ in sorted(counts['instance_provider']):
+        emit(line)
     
     # Regions count
-    cursor.execute("SELECT COUNT(*) FROM regions")
-    region_count = cursor.fetchone()[0]
-    stats.append(f"\n## Regions: {region_count}")
-    
-    cursor.execute("""
-        SELECT provider, COUNT(*) 
-        FROM regions 
-        GROUP BY provider 
-        ORDER BY provider
-    """)
+    emit(f"\n## Regions: {counts['regions'][0][2]}")
     
-    stats.append("\n### By Provider:")
-    for provider, count in cursor.fetchall():
-        stats.append(f"- **{provider.upper()}**: {count} regions")
+    emit("\n### By Provider:")
+    for line, _, _ in sorted(counts['region_provider']):
+        emit(line)
     
     # Images count
-    cursor.execute("SELECT COUNT(*) FROM images")
-    image_count = cursor.fetchone()[0]
-    stats.append(f"\n## OS Images: {image_count}")
+    emit(f"\n## OS Images: {counts['images'][0][2]}")
     
     # Instance family distribution
-    cursor.execute("""
-        SELECT family, provider, COUNT(*) 
-        FROM instance_types 
-        WHERE family IS NOT NULL 
-        GROUP BY family, provider 
-        ORDER BY family, provider
-    """)
-    
-    stats.append(f"\n## Instance Families")
+    emit(f"\n## Instance Families")
     current_family = None
-    for family, provider, count in cursor.fetchall():
+    for family, provider, count in sorted(counts['family']):
         if family != current_family:
-            stats.append(f"\n### {family.title()}")
+            emit(f"\n### {family.title()}")
             current_family = family
-        stats.append(f"- **{provider.upper()}**: {count} instances")
+        emit(f"- **{provider.upper()}**: {count} instances")
     
     # Recent changes (if available)
     try:
@@ -111,13 +227,13 @@ def generate_stats(db_path: str = "db/cloud_rosetta.db") -> str:
         """)
         recent_updates = cursor.fetchone()[0]
         if recent_updates > 0:
-            stats.append(f"\n## Recent Updates")
-            stats.append(f"- **Today**: {recent_updates} pricing updates")
+            emit(f"\n## Recent Updates")
+            emit(f"- **Today**: {recent_updates} pricing updates")
     except:
         pass
     
     # Sample mappings
-    stats.append(f"\n## Sample Resource Mappings")
+    emit(f"\n## Sample Resource Mappings")
     
     cursor.execute("""
         SELECT aws_type, ovh_type, hetzner_type, resource_category 
@@ -126,50 +242,31 @@ def generate_stats(db_path: str = "db/cloud_rosetta.db") -> str:
         LIMIT 10
     """)
     
-    stats.append("\n| AWS | OVH | Hetzner | Category |")
-    stats.append("|-----|-----|---------|----------|")
+    emit("\n| AWS | OVH | Hetzner | Category |")
+    emit("|-----|-----|---------|----------|")
     
-    for aws, ovh, hetzner, category in cursor.fetchall():
+    for aws, ovh, hetzner, category in cursor:
         ovh_display = ovh if ovh else "—"
         hetzner_display = hetzner if hetzner else "—"
-        stats.append(f"| `{aws}` | `{ovh_display}` | `{hetzner_display}` | {category} |")
+        emit(f"| `{aws}` | `{ovh_display}` | `{hetzner_display}` | {category} |")
     
     # Sample instance mappings
-    stats.append(f"\n## Sample Instance Type Mappings")
+    emit(f"\n## Sample Instance Type Mappings")
     
     # Get equivalent instances across providers
-    cursor.execute("""
-        SELECT 
-            a.instance_type as aws_type,
-            o.instance_type as ovh_type,
-            h.instance_type as hetzner_type,
-            a.vcpu, a.memory_gb
-        FROM instance_types a
-        LEFT JOIN instance_types o ON ABS(a.vcpu - o.vcpu) <= 1 
-                                    AND ABS(a.memory_gb - o.memory_gb) <= 2 
-                                    AND o.provider = 'ovh'
-        LEFT JOIN instance_types h ON ABS(a.vcpu - h.vcpu) <= 1 
-                                    AND ABS(a.memory_gb - h.memory_gb) <= 2 
-                                    AND h.provider = 'hetzner'
-        WHERE a.provider = 'aws' 
-          AND (o.instance_type IS NOT NULL OR h.instance_type IS NOT NULL)
-        LIMIT 5
-    """)
+    emit("\n| AWS | OVH | Hetzner | vCPU | RAM |")
+    emit("|-----|-----|---------|------|-----|")
     
-    stats.append("\n| AWS | OVH | Hetzner | vCPU | RAM |")
-    stats.append("|-----|-----|---------|------|-----|")
-    
-    for aws, ovh, hetzner, vcpu, memory in cursor.fetchall():
+    for aws, ovh, hetzner, vcpu, memory in islice(_sample_instance_mappings(conn), 5):
         ovh_display = ovh if ovh else "—"
         hetzner_display = hetzner if hetzner else "—"
-        stats.append(f"| `{aws}` | `{ovh_display}` | `{hetzner_display}` | {vcpu} | {memory}GB |")
+        emit(f"| `{aws}` | `{ovh_display}` | `{hetzner_display}` | {vcpu} | {memory}GB |")
     
     # Footer
-    stats.append(f"\n---")
-    stats.append(f"\n*Database generated by Cloud Rosetta • Visit [github.com/gordonmurray/cloud-rosetta](https://github.com/gordonmurray/cloud-rosetta)*")
+    emit(f"\n---")
+    emit(f"\n*Database generated by Cloud Rosetta • Visit [github.com/gordonmurray/cloud-rosetta](https://github.com/gordonmurray/cloud-rosetta)*")
     
     conn.close()
-    return "\n".join(stats)
 
 
 def main():
@@ -180,17 +277,17 @@ def main():
     parser.add_argument("--db", default="db/cloud_rosetta.db", 
                        help="Path to database file")
     parser.add_argument("--output", help="Output file (default: stdout)")
+    parser.add_argument("--no-cache", action="store_true",
+                       help=f"Regenerate even if {STATS_CACHE_NAME} matches the database")
     
     args = parser.parse_args()
     
-    stats = generate_stats(args.db)
-    
     if args.output:
         with open(args.output, 'w') as f:
-            f.write(stats)
+            generate_stats(args.db, f, not args.no_cache)
         print(f"Stats written to {args.output}")
     else:
-        print(stats)
+        generate_stats(args.db, sys.stdout, not args.no_cache)
 
 
 if __name__ == "__main__":
@@ -4,11 +4,18 @@ Rosetta Stone for Cloud Infrastructure v2
 Database-driven translation of Terraform plans between cloud providers
 """
 
+import copy
 import json
 import sys
 import argparse
+import functools
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+
+try:
+    import orjson  # Optional: faster JSON encode/decode when installed
+except ImportError:
+    orjson = None
 
 # Configure logging
 logging.basicConfig(
@@ -18,6 +25,16 @@ logging.basicConfig(
 )
 logger = logging.getLogger('translator')
 
+
+def _load_json(path: str) -> Any:
+    """Read a JSON file, parsing with orjson when it is installed"""
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
 try:
     from database_manager import CloudRosettaDB
 except ImportError:
@@ -28,14 +45,145 @@ except ImportError:
 class RosettaTranslator:
     """Database-driven translator for Terraform plans between cloud providers"""
     
-    def __init__(self, plan_data: Dict[str, Any], db_path: str = "cloud_rosetta.db"):
+    # Fixed per-instance state; slots keep the hot-path self.x reads off a dict
+    __slots__ = ("plan_data", "translated_plan", "db", "source_provider", "target_provider",
+                 "_find_equivalent_instance", "_find_nearest_region", "_map_resource_type",
+                 "_direct_fields", "_image_map", "_log_buf")
+    
+    # Terraform provider name / resource type prefix -> cloud provider, in the
+    # order detect_source_provider checks the configured providers
+    _PROVIDER_PREFIXES = {
+        "openstack": "ovh",
+        "aws": "aws",
+        "hcloud": "hetzner",
+        "azurerm": "azure",
+        "google": "gcp",
+    }
+    
+    # Source image name -> equivalent target image (same OS family/version)
+    _IMAGE_MAP_SQL = """
+        SELECT i1.image_name, i2.image_name 
+        FROM images i1
+        JOIN images i2 ON i1.os_family = i2.os_family 
+                      AND i1.os_version = i2.os_version
+        WHERE i1.provider = ? AND i1.image_name IN (SELECT value FROM json_each(?))
+          AND i2.provider = ?
+    """
+    
+    # Field each target provider uses for the instance type, region and image
+    # in translated instance values (providers not listed keep no instance type,
+    # and use "region" / "image_name")
+    _INSTANCE_TYPE_FIELD = {"aws": "instance_type", "ovh": "flavor_name", "hetzner": "server_type"}
+    _REGION_FIELD = {"aws": ("availability_zone", "a"), "hetzner": ("location", "")}
+    _IMAGE_FIELD = {"aws": "ami", "hetzner": "image"}
+    
+    # values.get() default telling an absent field from one set to null
+    _MISSING = object()
+    
+    # Fields copied straight across, by target provider (default: as-is):
+    # (source field, target field, optional wrapper for the value)
+    _DIRECT_FIELDS = {
+        "aws": (("name", "tags", lambda v: {"Name": v}),
+                ("key_pair", "key_name", None),
+                ("user_data", "user_data", None),
+                ("security_groups", "vpc_security_group_ids", None)),
+        "hetzner": (("name", "name", None),
+                    ("key_pair", "ssh_keys", lambda v: [v]),
+                    ("user_data", "user_data", None)),
+    }
+    _DEFAULT_DIRECT_FIELDS = (("name", "name", None),
+                              ("user_data", "user_data", None))
+    
+    # Provider-specific fields that cleanup_values removes, by source provider
+    _PROVIDER_SPECIFIC_FIELDS = {
+        "ovh": frozenset({"flavor_name", "image_name", "region", "network", "metadata",
+                          "power_state", "admin_pass", "personality", "vendor_options",
+                          "scheduler_hints", "network_mode", "config_drive",
+                          "availability_zone_hints", "block_device", "force_delete",
+                          "stop_before_destroy"}),
+        "aws": frozenset({"instance_type", "ami", "availability_zone", "tags",
+                          "key_name", "associate_public_ip_address",
+                          "vpc_security_group_ids"}),
+        "hetzner": frozenset({"server_type", "image", "location", "ssh_keys",
+                              "datacenter", "firewall_ids", "placement_group_id"}),
+    }
+    
+    # provider_config written into translated plans, by target provider
+    _PROVIDER_CONFIG_TEMPLATES = {
+        "aws": {
+            "aws": {
+                "name": "aws",
+                "full_name": "registry.terraform.io/hashicorp/aws",
+                "version_constraint": "~> 5.0",
+                "expressions": {
+                    "region": {"constant_value": "us-east-1"}
+                }
+            }
+        },
+        "hetzner": {
+            "hcloud": {
+                "name": "hcloud",
+                "full_name": "registry.terraform.io/hetznercloud/hcloud",
+                "version_constraint": "~> 1.42",
+                "expressions": {}
+            }
+        },
+        "ovh": {
+            "openstack": {
+                "name": "openstack",
+                "full_name": "registry.terraform.io/terraform-provider-openstack/openstack",
+                "version_constraint": "~> 1.49",
+                "expressions": {
+                    "auth_url": {"constant_value": "https://auth.cloud.ovh.net/v3"},
+                    "domain_name": {"constant_value": "Default"}
+                }
+            }
+        },
+        "azure": {
+            "azurerm": {
+                "name": "azurerm",
+                "full_name": "registry.terraform.io/hashicorp/azurerm",
+                "version_constraint": "~> 3.0",
+                "expressions": {
+                    "features": {"constant_value": {}}
+                }
+            }
+        },
+        "gcp": {
+            "google": {
+                "name": "google",
+                "full_name": "registry.terraform.io/hashicorp/google",
+                "version_constraint": "~> 5.0",
+                "expressions": {
+                    "project": {"constant_value": "my-project"},
+                    "region": {"constant_value": "us-central1"}
+                }
+            }
+        },
+    }
+    
+    def __init__(self, plan_data: Dict[str, Any], db_path: str = "cloud_rosetta.db",
+                 copy_plan: bool = True):
+        """Pass copy_plan=False to translate plan_data in place when the caller no longer needs it"""
         try:
             self.plan_data = plan_data
-            self.translated_plan = json.loads(json.dumps(plan_data))  # Deep copy
+            # The JSON round-trip is the fastest deep copy for plain JSON data
+            self.translated_plan = json.loads(json.dumps(plan_data)) if copy_plan else plan_data
             logger.info(f"Initializing translator with database: {db_path}")
             self.db = CloudRosettaDB(db_path)
+            # A plan repeats the same few types, flavors and regions across its
+            # resources, so each distinct lookup goes to the database once
+            self._find_equivalent_instance = functools.lru_cache(maxsize=4096)(self.db.find_equivalent_instance)
+            self._find_nearest_region = functools.lru_cache(maxsize=4096)(self.db.find_nearest_region)
+            self._map_resource_type = functools.lru_cache(maxsize=4096)(self.db.map_resource_type)
             self.source_provider = None
             self.target_provider = None
+            # _DIRECT_FIELDS entry for target_provider, set once per translate()
+            self._direct_fields = self._DEFAULT_DIRECT_FIELDS
+            # Source image_name -> target image_name, filled once per translate()
+            self._image_map: Dict[str, str] = {}
+            # Progress lines for stderr, written out in one call by translate()
+            self._log_buf: List[str] = []
         except Exception as e:
             logger.error(f"Failed to initialize translator: {e}")
             raise
@@ -47,30 +195,18 @@ class RosettaTranslator:
             if "provider_config" in self.plan_data["configuration"]:
                 providers = self.plan_data["configuration"]["provider_config"]
                 
-                if "openstack" in providers or "openstack.ovh" in providers:
+                if "openstack.ovh" in providers:
                     return "ovh"
-                elif "aws" in providers:
-                    return "aws"
-                elif "hcloud" in providers:
-                    return "hetzner"
-                elif "azurerm" in providers:
-                    return "azure"
-                elif "google" in providers:
-                    return "gcp"
+                for prefix, provider in self._PROVIDER_PREFIXES.items():
+                    if prefix in providers:
+                        return provider
         
-        # Check resource types as fallback
+        # Check resource types as fallback: one dict lookup on the type's prefix
         if "resource_changes" in self.plan_data:
             for change in self.plan_data["resource_changes"]:
-                if change["type"].startswith("openstack_"):
-                    return "ovh"
-                elif change["type"].startswith("aws_"):
-                    return "aws"
-                elif change["type"].startswith("hcloud_"):
-                    return "hetzner"
-                elif change["type"].startswith("azurerm_"):
-                    return "azure"
-                elif change["type"].startswith("google_"):
-                    return "gcp"
+                prefix, sep, _ = change["type"].partition("_")
+                if sep and prefix in self._PROVIDER_PREFIXES:
+                    return self._PROVIDER_PREFIXES[prefix]
         
         return "unknown"
     
@@ -79,122 +215,94 @@ class RosettaTranslator:
         """Translate instance values using database mappings"""
         translated = {}
         
+        source = self.source_provider
+        target = self.target_provider
+        log = self._log
+        missing = self._MISSING  # Fields may be present with a null value
+        
         # Map instance type/flavor
-        if "flavor_name" in values:  # OVH
-            flavor = values["flavor_name"]
-            instance_type = self.db.find_equivalent_instance(
-                self.source_provider, flavor, self.target_provider
-            )
-            if instance_type:
-                if self.target_provider == "aws":
-                    translated["instance_type"] = instance_type
-                elif self.target_provider == "hetzner":
-                    translated["server_type"] = instance_type
-                print(f"  Mapped {self.source_provider} '{flavor}' → {self.target_provider} '{instance_type}'", 
-                      file=sys.stderr)
-        elif "instance_type" in values:  # AWS
-            instance_type = values["instance_type"]
-            mapped_type = self.db.find_equivalent_instance(
-                self.source_provider, instance_type, self.target_provider
-            )
-            if mapped_type:
-                if self.target_provider == "ovh":
-                    translated["flavor_name"] = mapped_type
-                elif self.target_provider == "hetzner":
-                    translated["server_type"] = mapped_type
-                print(f"  Mapped {self.source_provider} '{instance_type}' → {self.target_provider} '{mapped_type}'",
-                      file=sys.stderr)
-        elif "server_type" in values:  # Hetzner
-            server_type = values["server_type"]
-            mapped_type = self.db.find_equivalent_instance(
-                self.source_provider, server_type, self.target_provider
-            )
-            if mapped_type:
-                if self.target_provider == "aws":
-                    translated["instance_type"] = mapped_type
-                elif self.target_provider == "ovh":
-                    translated["flavor_name"] = mapped_type
-                print(f"  Mapped {self.source_provider} '{server_type}' → {self.target_provider} '{mapped_type}'",
-                      file=sys.stderr)
+        for source_field in ("flavor_name", "instance_type", "server_type"):  # OVH, AWS, Hetzner
+            source_type = values.get(source_field, missing)
+            if source_type is not missing:
+                mapped_type = self._find_equivalent_instance(source, source_type, target)
+                if mapped_type:
+                    target_field = self._INSTANCE_TYPE_FIELD.get(target)
+                    if target_field is not None and target_field != source_field:
+                        translated[target_field] = mapped_type
+                    log(f"  Mapped {source} '{source_type}' → {target} '{mapped_type}'")
+                break
         
         # Map region
-        region_field = None
-        if "region" in values:
-            region_field = "region"
-        elif "location" in values:
-            region_field = "location"
-        elif "availability_zone" in values:
-            region_field = "availability_zone"
-        
-        if region_field:
-            source_region = values[region_field]
-            # For AWS availability zones, extract region
-            if self.source_provider == "aws" and source_region.endswith(('a', 'b', 'c', 'd')):
-                source_region = source_region[:-1]
-            
-            target_region = self.db.find_nearest_region(
-                self.source_provider, source_region, self.target_provider
-            )
-            if target_region:
-                if self.target_provider == "aws":
-                    translated["availability_zone"] = f"{target_region}a"
-                elif self.target_provider == "hetzner":
-                    translated["location"] = target_region
-                else:
-                    translated["region"] = target_region
-                print(f"  Mapped region '{values[region_field]}' → '{target_region}'", 
-                      file=sys.stderr)
+        for region_field in ("region", "location", "availability_zone"):
+            region_value = values.get(region_field, missing)
+            if region_value is not missing:
+                source_region = region_value
+                # For AWS availability zones, extract region
+                if source == "aws" and source_region.endswith(('a', 'b', 'c', 'd')):
+                    source_region = source_region[:-1]
+                
+                target_region = self._find_nearest_region(source, source_region, target)
+                if target_region:
+                    field, suffix = self._REGION_FIELD.get(target, ("region", ""))
+                    translated[field] = target_region + suffix
+                    log(f"  Mapped region '{region_value}' → '{target_region}'")
+                break
         
         # Map image/OS
-        if "image_name" in values:  # OVH
-            # Query database for equivalent image
-            self.db.cursor.execute("""
-                SELECT i2.image_name 
-                FROM images i1
-                JOIN images i2 ON i1.os_family = i2.os_family 
-                              AND i1.os_version = i2.os_version
-                WHERE i1.provider = ? AND i1.image_name = ?
-                  AND i2.provider = ?
-                LIMIT 1
-            """, (self.source_provider, values["image_name"], self.target_provider))
-            result = self.db.cursor.fetchone()
-            if result:
-                if self.target_provider == "aws":
-                    translated["ami"] = result[0]
-                elif self.target_provider == "hetzner":
-                    translated["image"] = result[0]
-                else:
-                    translated["image_name"] = result[0]
-                print(f"  Mapped image '{values['image_name']}' → '{result[0]}'", 
-                      file=sys.stderr)
-        
-        # Direct mappings that work across providers
-        if "name" in values:
-            if self.target_provider == "aws":
-                translated["tags"] = {"Name": values["name"]}
-            else:
-                translated["name"] = values["name"]
+        image_name = values.get("image_name")  # OVH
+        if image_name is not None:
+            # Equivalent images were looked up for the whole plan by _prefetch_image_map
+            target_image = self._image_map.get(image_name)
+            if target_image:
+                translated[self._IMAGE_FIELD.get(target, "image_name")] = target_image
+                log(f"  Mapped image '{image_name}' → '{target_image}'")
         
-        if "key_pair" in values:
-            if self.target_provider == "aws":
-                translated["key_name"] = values["key_pair"]
-            elif self.target_provider == "hetzner":
-                translated["ssh_keys"] = [values["key_pair"]]
-        
-        if "user_data" in values:
-            translated["user_data"] = values["user_data"]
+        # Direct mappings, already narrowed to the target provider
+        for source_field, target_field, wrap in self._direct_fields:
+            value = values.get(source_field, missing)
+            if value is not missing:
+                translated[target_field] = wrap(value) if wrap else value
         
         # Network configuration
-        if "network" in values and len(values["network"]) > 0:
-            if self.target_provider == "aws":
+        if target == "aws":
+            network = values.get("network", missing)
+            if network is not missing and len(network) > 0:
                 translated["associate_public_ip_address"] = True
         
-        # Security groups (AWS specific)
-        if "security_groups" in values and self.target_provider == "aws":
-            translated["vpc_security_group_ids"] = values["security_groups"]
-        
         return translated
     
+    def _prefetch_image_map(self) -> Dict[str, str]:
+        """Look up the target image for every image_name in the plan in one query
+        
+        Replaces a JOIN per compute resource with one per plan.
+        """
+        names = set()
+        for _, holder, key, _ in self._iter_resources():
+            if holder is not None:
+                image_name = (holder.get(key) or {}).get("image_name")
+                if isinstance(image_name, str):
+                    names.add(image_name)
+        
+        image_map: Dict[str, str] = {}
+        # One fixed statement (names passed as a JSON array) so sqlite3's
+        # statement cache prepares it once and no chunking is needed
+        rows = self.db.conn.execute(self._IMAGE_MAP_SQL, (
+            self.source_provider, json.dumps(sorted(names)), self.target_provider))
+        for source_image, target_image in rows:
+            # First match wins, as with the per-resource LIMIT 1 query
+            image_map.setdefault(source_image, target_image)
+        return image_map
+    
+    def _log(self, message: str):
+        """Queue a progress line for stderr"""
+        self._log_buf.append(message)
+    
+    def _flush_log(self):
+        """Write the queued progress lines to stderr in one call"""
+        if self._log_buf:
+            sys.stderr.write("".join(f"{line}\n" for line in self._log_buf))
+            self._log_buf.clear()
+    
     def translate_provider_name(self, provider: str) -> str:
         """Translate provider names"""
         provider_map = {
@@ -214,72 +322,69 @@ class RosettaTranslator:
         
         return provider
     
+    def _iter_resources(self):
+        """Yield (resource, holder, key, label) for every planned resource, then every change
+        
+        holder[key] is the values dict to translate: a planned resource's
+        "values", or a change's "after" state. holder is None for changes
+        without an after state, which only get their type and provider mapped.
+        """
+        plan = self.translated_plan
+        if "planned_values" in plan and "root_module" in plan["planned_values"]:
+            for resource in plan["planned_values"]["root_module"].get("resources", ()):
+                yield resource, resource, "values", "Processing"
+        for change in plan.get("resource_changes", ()):
+            holder = change["change"] if "change" in change and "after" in change["change"] else None
+            yield change, holder, "after", "Processing change"
+    
+    def _translate_one(self, resource: Dict[str, Any], holder: Optional[Dict[str, Any]],
+                       key: str, label: str):
+        """Translate one resource (and its values in holder[key]) in place"""
+        original_type = resource["type"]
+        
+        # Map resource type using database
+        new_type = self._map_resource_type(original_type, self.target_provider)
+        if not new_type:
+            return
+        resource["type"] = new_type
+        resource["provider_name"] = self.translate_provider_name(resource["provider_name"])
+        if holder is None:
+            return
+        
+        self._log(f"\n{label}: {resource['address']}")
+        self._log(f"  Resource type: {original_type} → {new_type}")
+        
+        # Translate values for compute instances
+        if "compute" in original_type or "instance" in original_type or "server" in original_type:
+            holder[key] = self.translate_instance_values(holder[key], original_type)
+        
+        # Clean up provider-specific fields
+        self.cleanup_values(holder[key])
+    
     def translate(self, target_provider: str) -> Dict[str, Any]:
         """Main translation method"""
         try:
             self.source_provider = self.detect_source_provider()
             self.target_provider = target_provider
+            self._direct_fields = self._DIRECT_FIELDS.get(target_provider, self._DEFAULT_DIRECT_FIELDS)
+            self._image_map = self._prefetch_image_map()
             
             logger.info(f"Starting translation from {self.source_provider} to {target_provider}")
-            print(f"Translating from {self.source_provider.upper()} to {target_provider.upper()}...", 
-                  file=sys.stderr)
-            
-            # Translate planned values resources
-            if "planned_values" in self.translated_plan:
-                if "root_module" in self.translated_plan["planned_values"]:
-                    if "resources" in self.translated_plan["planned_values"]["root_module"]:
-                        for resource in self.translated_plan["planned_values"]["root_module"]["resources"]:
-                            original_type = resource["type"]
-                            
-                            # Map resource type using database
-                            new_type = self.db.map_resource_type(original_type, target_provider)
-                            if new_type:
-                                resource["type"] = new_type
-                                resource["provider_name"] = self.translate_provider_name(resource["provider_name"])
-                                
-                                print(f"\nProcessing: {resource['address']}", file=sys.stderr)
-                                print(f"  Resource type: {original_type} → {new_type}", file=sys.stderr)
-                                
-                                # Translate values for compute instances
-                                if "compute" in original_type or "instance" in original_type or "server" in original_type:
-                                    resource["values"] = self.translate_instance_values(
-                                        resource["values"], original_type
-                                    )
-                                
-                                # Clean up provider-specific fields
-                                self.cleanup_values(resource["values"])
+            self._log(f"Translating from {self.source_provider.upper()} to {target_provider.upper()}...")
             
-            # Translate resource changes
-            if "resource_changes" in self.translated_plan:
-                for change in self.translated_plan["resource_changes"]:
-                    original_type = change["type"]
-                    
-                    # Map resource type using database
-                    new_type = self.db.map_resource_type(original_type, target_provider)
-                    if new_type:
-                        change["type"] = new_type
-                        change["provider_name"] = self.translate_provider_name(change["provider_name"])
-                        
-                        if "change" in change and "after" in change["change"]:
-                            print(f"\nProcessing change: {change['address']}", file=sys.stderr)
-                            print(f"  Resource type: {original_type} → {new_type}", file=sys.stderr)
-                            
-                            # Translate values for compute instances
-                            if "compute" in original_type or "instance" in original_type or "server" in original_type:
-                                change["change"]["after"] = self.translate_instance_values(
-                                    change["change"]["after"], original_type
-                                )
-                            
-                            # Clean up provider-specific fields
-                            self.cleanup_values(change["change"]["after"])
+            # Translate planned values resources and resource changes in one pass
+            for resource, holder, key, label in self._iter_resources():
+                self._translate_one(resource, holder, key, label)
             
             # Update provider configuration
             self.update_provider_config()
             
+            self._log("\nDone: Translation complete!")
+            self._flush_log()
             logger.info("Translation completed successfully")
-            print("\nDone: Translation complete!", file=sys.stderr)
             return self.translated_plan
         except Exception as e:
+            self._flush_log()
             logger.error(f"Translation failed: {e}")
             raise
     
@@ -288,32 +393,11 @@ class RosettaTranslator:
         if not values:
             return
         
-        # Fields to remove based on source provider
-        ovh_specific = ["flavor_name", "image_name", "region", "network", "metadata",
-                       "power_state", "admin_pass", "personality", "vendor_options",
-                       "scheduler_hints", "network_mode", "config_drive",
-                       "availability_zone_hints", "block_device", "force_delete",
-                       "stop_before_destroy"]
-        
-        aws_specific = ["instance_type", "ami", "availability_zone", "tags",
-                       "key_name", "associate_public_ip_address", 
-                       "vpc_security_group_ids"]
-        
-        hetzner_specific = ["server_type", "image", "location", "ssh_keys",
-                           "datacenter", "firewall_ids", "placement_group_id"]
-        
-        # Remove fields based on source provider
-        if self.source_provider == "ovh":
-            fields_to_remove = ovh_specific
-        elif self.source_provider == "aws":
-            fields_to_remove = aws_specific
-        elif self.source_provider == "hetzner":
-            fields_to_remove = hetzner_specific
-        else:
-            fields_to_remove = []
-        
-        for field in fields_to_remove:
-            values.pop(field, None)
+        # keys() & set walks whichever side is smaller, in C, and returns a
+        # new set so deleting while looping is safe
+        fields_to_remove = self._PROVIDER_SPECIFIC_FIELDS.get(self.source_provider, frozenset())
+        for field in values.keys() & fields_to_remove:
+            del values[field]
     
     def update_provider_config(self):
         """Update provider configuration for target provider"""
@@ -324,66 +408,31 @@ class RosettaTranslator:
             return
         
         # Set appropriate provider config based on target
-        if self.target_provider == "aws":
-            self.translated_plan["configuration"]["provider_config"] = {
-                "aws": {
-                    "name": "aws",
-                    "full_name": "registry.terraform.io/hashicorp/aws",
-                    "version_constraint": "~> 5.0",
-                    "expressions": {
-                        "region": {"constant_value": "us-east-1"}
-                    }
-                }
-            }
-        elif self.target_provider == "hetzner":
-            self.translated_plan["configuration"]["provider_config"] = {
-                "hcloud": {
-                    "name": "hcloud",
-                    "full_name": "registry.terraform.io/hetznercloud/hcloud",
-                    "version_constraint": "~> 1.42",
-                    "expressions": {}
-                }
-            }
-        elif self.target_provider == "ovh":
-            self.translated_plan["configuration"]["provider_config"] = {
-                "openstack": {
-                    "name": "openstack",
-                    "full_name": "registry.terraform.io/terraform-provider-openstack/openstack",
-                    "version_constraint": "~> 1.49",
-                    "expressions": {
-                        "auth_url": {"constant_value": "https://auth.cloud.ovh.net/v3"},
-                        "domain_name": {"constant_value": "Default"}
-                    }
-                }
-            }
-        elif self.target_provider == "azure":
-            self.translated_plan["configuration"]["provider_config"] = {
-                "azurerm": {
-                    "name": "azurerm",
-                    "full_name": "registry.terraform.io/hashicorp/azurerm",
-                    "version_constraint": "~> 3.0",
-                    "expressions": {
-                        "features": {"constant_value": {}}
-                    }
-                }
-            }
-        elif self.target_provider == "gcp":
-            self.translated_plan["configuration"]["provider_config"] = {
-                "google": {
-                    "name": "google",
-                    "full_name": "registry.terraform.io/hashicorp/google",
-                    "version_constraint": "~> 5.0",
-                    "expressions": {
-                        "project": {"constant_value": "my-project"},
-                        "region": {"constant_value": "us-central1"}
-                    }
-                }
-            }
+        template = self._PROVIDER_CONFIG_TEMPLATES.get(self.target_provider)
+        if template is not None:
+            self.translated_plan["configuration"]["provider_config"] = copy.deepcopy(template)
     
-    def __del__(self):
-        """Clean up database connection"""
-        if hasattr(self, 'db'):
+    def close(self):
+        """Close the database connection and drop the plan and lookup caches
+        
+        Safe to call more than once. Use the translator as a context manager
+        to have this done when translation finishes.
+        """
+        if self.db is not None:
+            for lookup in (self._find_equivalent_instance, self._find_nearest_region,
+                           self._map_resource_type):
+                lookup.cache_clear()
             self.db.close()
+            self.db = None
+        self.plan_data = None
+        self.translated_plan = None
+        self._image_map = {}
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
 
 
 def main():
@@ -407,23 +456,29 @@ def main():
         
         # Read input plan
         logger.info(f"Reading input plan: {args.input_file}")
-        with open(args.input_file, 'r') as f:
-            plan_data = json.load(f)
+        plan_data = _load_json(args.input_file)
     
         # Translate
-        translator = RosettaTranslatorV2(plan_data, args.db)
-        translated_plan = translator.translate(args.target)
+        with RosettaTranslator(plan_data, args.db, copy_plan=False) as translator:
+            translated_plan = translator.translate(args.target)
     
-        # Output
-        output_json = json.dumps(translated_plan, indent=2)
-        
+        # Output, written straight to the file or stdout instead of building
+        # the indented document as one string first
         if args.output:
-            with open(args.output, 'w') as f:
-                f.write(output_json)
+            if orjson is not None:
+                with open(args.output, 'wb') as f:
+                    f.write(orjson.dumps(translated_plan, option=orjson.OPT_INDENT_2))
+            else:
+                with open(args.output, 'w') as f:
+                    json.dump(translated_plan, f, indent=2)
             logger.info(f"Translated plan saved to: {args.output}")
             print(f"\nTranslated plan saved to: {args.output}", file=sys.stderr)
+        elif orjson is not None:
+            sys.stdout.flush()
+            sys.stdout.buffer.write(orjson.dumps(translated_plan, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
         else:
-            print(output_json)
+            json.dump(translated_plan, sys.stdout, indent=2)
+            sys.stdout.write("\n")
     
     except FileNotFoundError as e:
         logger.error(f"File not found: {e}")
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Cloud Rosetta database lookups
+Tests lookups, read-only opens and tooling in database_manager and the rosetta CLI
+"""
+
+import sys
+import json
+import shutil
+import subprocess
+import tempfile
+import importlib.machinery
+import importlib.util
+from pathlib import Path
+
+# Add scripts directory to path
+repo_dir = Path(__file__).parent.parent
+script_dir = repo_dir / 'scripts'
+sys.path.insert(0, str(script_dir))
+
+SHIPPED_DB = repo_dir / 'db' / 'cloud_rosetta.db'
+
+
+def _copy_shipped_db(tmp_dir: str, name: str = "cloud_rosetta.db") -> str:
+    """Copy the shipped database so tests never touch the tracked file"""
+    path = Path(tmp_dir) / name
+    shutil.copy(SHIPPED_DB, path)
+    return str(path)
+
+
+def _load_rosetta_cli():
+    """Import the extension-less rosetta script as a module"""
+    loader = importlib.machinery.SourceFileLoader("rosetta_cli", str(repo_dir / 'rosetta'))
+    module = importlib.util.module_from_spec(importlib.util.spec_from_loader("rosetta_cli", loader))
+    loader.exec_module(module)
+    return module
+
+
+def test_nearest_region_great_circle():
+    """Test region matching uses great-circle distance in both entry points"""
+    try:
+        from database_manager import CloudRosettaDB
+        rosetta_cli = _load_rosetta_cli()
+
+        # GRA is closer to London than Paris; Sydney is closer to Helsinki than Ashburn
+        expected = [
+            ("ovh", "GRA9", "aws", "eu-west-2"),
+            ("aws", "ap-southeast-2", "hetzner", "hel1"),
+        ]
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db = CloudRosettaDB(_copy_shipped_db(tmp_dir), read_only=True)
+            cli_db = rosetta_cli.CloudRosettaDB(_copy_shipped_db(tmp_dir, "cli.db"))
+
+            ok = True
+            for source_provider, source_region, target_provider, want in expected:
+                got = db.find_nearest_region(source_provider, source_region, target_provider)
+                got_cli = cli_db.find_nearest_region(source_provider, source_region, target_provider)
+                if got == want and got_cli == want:
+                    print(f"PASSED {source_provider} {source_region} -> {target_provider} {want}")
+                else:
+                    print(f"FAILED {source_provider} {source_region} -> {target_provider}: "
+                          f"database_manager {got}, rosetta {got_cli}, expected {want}")
+                    ok = False
+
+            # Both entry points must agree on every region pair
+            regions = db.conn.execute("SELECT provider, region_code FROM regions").fetchall()
+            providers = sorted({provider for provider, _ in regions})
+            mismatches = [
+                (provider, region_code, target)
+                for provider, region_code in regions
+                for target in providers
+                if db.find_nearest_region(provider, region_code, target)
+                != cli_db.find_nearest_region(provider, region_code, target)
+            ]
+            if mismatches:
+                print(f"FAILED Region lookups disagree for {len(mismatches)} pairs, e.g. {mismatches[0]}")
+                ok = False
+            else:
+                print(f"PASSED Region lookups agree for {len(regions) * len(providers)} pairs")
+
+            db.close()
+            cli_db.close()
+        return ok
+    except Exception as e:
+        print(f"FAILED Nearest region test failed: {e}")
+        return False
+
+
+def test_read_only_path_escaping():
+    """Test read-only opens work for paths with URI metacharacters"""
+    try:
+        from database_manager import CloudRosettaDB
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            weird_dir = Path(tmp_dir) / "we#ird%20?dir"
+            weird_dir.mkdir()
+            db = CloudRosettaDB(_copy_shipped_db(str(weird_dir)), read_only=True)
+            mapped = db.find_equivalent_instance("aws", "t3.micro", "ovh")
+            db.close()
+
+        if mapped:
+            print(f"PASSED Read-only open of {weird_dir.name}: AWS t3.micro -> OVH {mapped}")
+            return True
+        print(f"FAILED Read-only open of {weird_dir.name}: no instance mapping")
+        return False
+    except Exception as e:
+        print(f"FAILED Read-only path test failed: {e}")
+        return False
+
+
+def test_frozen_export_matches_database():
+    """Test export-frozen output answers every lookup the same as the database"""
+    try:
+        from database_manager import CloudRosettaDB, FrozenRosetta
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = _copy_shipped_db(tmp_dir)
+            module_path = str(Path(tmp_dir) / "mappings_frozen.py")
+            db = CloudRosettaDB(db_path, read_only=True)
+            db.export_frozen(module_path)
+            frozen = FrozenRosetta(module_path)
+
+            providers = db.get_providers()
+            instances = db.conn.execute("SELECT provider, instance_type FROM instance_types").fetchall()
+            regions = db.conn.execute("SELECT provider, region_code FROM regions").fetchall()
+            resource_types = [row[0] for row in db.conn.execute("""
+                SELECT aws_type FROM resource_mappings WHERE aws_type IS NOT NULL
+                UNION SELECT ovh_type FROM resource_mappings WHERE ovh_type IS NOT NULL
+                UNION SELECT hetzner_type FROM resource_mappings WHERE hetzner_type IS NOT NULL
+            """)]
+
+            checks = [
+                ("find_equivalent_instance", [(p, t, target) for p, t in instances for target in providers]),
+                ("find_nearest_region", [(p, r, target) for p, r in regions for target in providers]),
+                ("map_resource_type", [(t, target) for t in resource_types for target in providers]),
+            ]
+            ok = frozen.get_providers() == providers
+            if not ok:
+                print(f"FAILED Frozen providers {frozen.get_providers()} != {providers}")
+            for method, calls in checks:
+                mismatches = [call for call in calls
+                              if getattr(frozen, method)(*call) != getattr(db, method)(*call)]
+                if mismatches:
+                    print(f"FAILED {method}: {len(mismatches)} of {len(calls)} differ, e.g. {mismatches[0]}")
+                    ok = False
+                else:
+                    print(f"PASSED {method}: all {len(calls)} lookups match the database")
+
+            # The CLI's --frozen flag serves the same answers as --db
+            lookup = ["map-instance", "--source-provider", "aws", "--source-type", "t3.micro",
+                      "--target-provider", "hetzner"]
+            cli = [sys.executable, str(script_dir / "database_manager.py")]
+            from_db = subprocess.run(cli + lookup + ["--db", db_path], capture_output=True, text=True).stdout
+            from_frozen = subprocess.run(cli + lookup + ["--frozen", module_path],
+                                         capture_output=True, text=True).stdout
+            if from_db and from_db == from_frozen:
+                print(f"PASSED --frozen CLI lookup: {from_frozen.strip()}")
+            else:
+                print(f"FAILED --frozen CLI lookup: {from_frozen!r} != {from_db!r}")
+                ok = False
+
+            frozen.close()
+            db.close()
+        return ok
+    except Exception as e:
+        print(f"FAILED Frozen export test failed: {e}")
+        return False
+
+
+def test_batch_lookups():
+    """Test --batch JSONL mode with good, blank, malformed and incomplete lines and a missing file"""
+    try:
+        lines = [
+            '{"source_provider": "aws", "source_type": "t3.micro", "target_provider": "ovh"}',
+            '',
+            '{not json',
+            '{"source_provider": "aws", "target_provider": "ovh"}',
+            '["aws", "t3.micro", "ovh"]',
+            '{"source_provider": "aws", "source_type": "no-such-type", "target_provider": "ovh"}',
+        ]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = _copy_shipped_db(tmp_dir)
+            batch_path = Path(tmp_dir) / "lookups.jsonl"
+            batch_path.write_text("\n".join(lines) + "\n")
+            cli = [sys.executable, str(script_dir / "database_manager.py"), "map-instance", "--db", db_path]
+            proc = subprocess.run(cli + ["--batch", str(batch_path)], capture_output=True, text=True)
+            missing_path = str(Path(tmp_dir) / "no-such-lookups.jsonl")
+            missing = subprocess.run(cli + ["--batch", missing_path], capture_output=True, text=True)
+
+        results = [json.loads(line) for line in proc.stdout.splitlines()]
+        errors = proc.stderr.splitlines()
+        expected_results = [
+            {"source_provider": "aws", "source_type": "t3.micro", "target_provider": "ovh", "result": "d2-2"},
+            {"source_provider": "aws", "source_type": "no-such-type", "target_provider": "ovh", "result": None},
+        ]
+        expected_errors = [
+            "Error: line 3: invalid JSON: ",
+            "Error: line 4: missing field: source_type",
+            "Error: line 5: expected a JSON object",
+        ]
+
+        ok = True
+        if results == expected_results:
+            print(f"PASSED Batch results: {len(results)} lines echoed with results, blank line skipped")
+        else:
+            print(f"FAILED Batch results: {results}")
+            ok = False
+        if len(errors) == len(expected_errors) and all(
+                error.startswith(want) for error, want in zip(errors, expected_errors)):
+            print(f"PASSED Batch errors: {len(errors)} bad lines reported by line number")
+        else:
+            print(f"FAILED Batch errors: {errors}")
+            ok = False
+        if (missing.returncode == 0 and not missing.stdout
+                and missing.stderr.startswith(f"Error: cannot read batch file {missing_path}: ")
+                and "Traceback" not in missing.stderr):
+            print("PASSED Missing batch file reported without a traceback")
+        else:
+            print(f"FAILED Missing batch file: exit {missing.returncode}, stderr {missing.stderr!r}")
+            ok = False
+        return ok
+    except Exception as e:
+        print(f"FAILED Batch lookup test failed: {e}")
+        return False
+
+
+def main():
+    """Run all tests"""
+    print("TESTING Cloud Rosetta Database Lookup Tests")
+    print("==========================================")
+
+    tests = [
+        test_nearest_region_great_circle,
+        test_read_only_path_escaping,
+        test_frozen_export_matches_database,
+        test_batch_lookups,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        print(f"\n--- Running {test.__name__} ---")
+        try:
+            if test():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"FAILED Test {test.__name__} crashed: {e}")
+            failed += 1
+
+    print(f"\nTEST RESULTS:")
+    print(f"PASSED: {passed}")
+    print(f"FAILED: {failed}")
+    print(f"SUCCESS RATE: {passed/(passed+failed)*100:.1f}%")
+
+    if failed == 0:
+        print("\nSUCCESS: All tests passed!")
+        return 0
+    else:
+        print(f"\nERROR: {failed} test(s) failed. Check the output above.")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
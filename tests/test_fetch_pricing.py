@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Cloud Rosetta pricing fetcher
+Tests HTTP retry behaviour and the cached API response handling
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import socket
+import threading
+import logging
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+# Add scripts directory to path
+repo_dir = Path(__file__).parent.parent
+script_dir = repo_dir / 'scripts'
+sys.path.insert(0, str(script_dir))
+
+# The fetchers log every request; keep the test output to PASSED/FAILED lines
+logging.disable(logging.CRITICAL)
+
+
+class _FlakyHandler(BaseHTTPRequestHandler):
+    """Answers 503 to the first `failures` requests, then 200 with a JSON body"""
+    failures = 2
+    requests_seen = 0
+
+    def do_GET(self):
+        type(self).requests_seen += 1
+        status = 503 if self.requests_seen <= self.failures else 200
+        body = b'{"ok": true}'
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_retry_policy():
+    """Test gateway errors are retried but connection failures are not"""
+    try:
+        from fetch_pricing import PricingFetcher
+
+        fetcher = PricingFetcher()
+        adapter = fetcher.session.get_adapter("https://api.hetzner.cloud")
+        # Serve the test over plain HTTP with the same adapter and retry policy
+        fetcher.session.mount("http://", adapter)
+        ok = True
+
+        server = HTTPServer(("127.0.0.1", 0), _FlakyHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            response = fetcher.session.get(f"http://127.0.0.1:{server.server_port}/pricing")
+        finally:
+            server.shutdown()
+            server.server_close()
+        if response.status_code == 200 and _FlakyHandler.requests_seen == 3:
+            print("PASSED Two 503 responses retried, third request succeeded")
+        else:
+            print(f"FAILED 503 retry: status {response.status_code} after {_FlakyHandler.requests_seen} requests")
+            ok = False
+
+        # Nothing listens on a port we just released: fail at once, no backoff
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            closed_port = sock.getsockname()[1]
+        start = time.monotonic()
+        try:
+            fetcher.session.get(f"http://127.0.0.1:{closed_port}/pricing")
+            print("FAILED Connection to a closed port unexpectedly succeeded")
+            ok = False
+        except Exception:
+            elapsed = time.monotonic() - start
+            if elapsed < 0.25:
+                print(f"PASSED Connection failure raised after {elapsed:.2f}s without retries")
+            else:
+                print(f"FAILED Connection failure took {elapsed:.2f}s, retries are backing off")
+                ok = False
+        return ok
+    except Exception as e:
+        print(f"FAILED Retry policy test failed: {e}")
+        return False
+
+
+class _StubResponse:
+    """Just enough of requests.Response for PricingFetcher._get_json"""
+
+    def __init__(self, status_code: int, body=None, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = json.dumps(body).encode() if body is not None else b""
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class _StubSession:
+    """Records each GET and answers with the next queued response"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers=None):
+        self.requests.append((url, dict(headers or {})))
+        return self.responses.pop(0)
+
+
+def test_cached_pricing_fetcher():
+    """Test the pricing cache: miss, fresh hit, 304 revalidation and a corrupt sidecar"""
+    try:
+        from fetch_pricing import CachedPricingFetcher
+
+        url = "https://api.example.test/pricing"
+        body_v1 = {"pricing": {"volume": {"price_per_gb_month": {"gross": "0.0440"}}}}
+        body_v2 = {"pricing": {"volume": {"price_per_gb_month": {"gross": "0.0500"}}}}
+        validators = {"ETag": '"v1"', "Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"}
+
+        def fetcher_with(cache_dir, *responses):
+            fetcher = CachedPricingFetcher(cache_dir, ttl=3600)
+            fetcher.session = _StubSession(*responses)
+            return fetcher
+
+        ok = True
+        with tempfile.TemporaryDirectory() as cache_dir:
+            # Miss: live fetch, sidecar written with the validators
+            fetcher = fetcher_with(cache_dir, _StubResponse(200, body_v1, validators))
+            data = fetcher._get_json("test:pricing", url)
+            sidecar = fetcher._cache_path("test:pricing")
+            with open(sidecar) as f:
+                stored = json.load(f)
+            if (data == body_v1 and fetcher.misses == 1 and stored["body"] == body_v1
+                    and stored["etag"] == '"v1"' and stored["last_modified"] == validators["Last-Modified"]):
+                print("PASSED Cache miss fetched live and wrote the sidecar with ETag/Last-Modified")
+            else:
+                print(f"FAILED Cache miss: data {data}, sidecar {stored}")
+                ok = False
+
+            # Fresh hit: a new fetcher (empty memory cache) reads the sidecar, no request
+            fetcher = fetcher_with(cache_dir)
+            data = fetcher._get_json("test:pricing", url)
+            if data == body_v1 and fetcher.hits == 1 and not fetcher.session.requests:
+                print("PASSED Fresh sidecar served without a request")
+            else:
+                print(f"FAILED Fresh hit: data {data}, requests {fetcher.session.requests}")
+                ok = False
+
+            # Expired: conditional GET, 304 reuses the body and restarts the TTL
+            expired = time.time() - 7200
+            os.utime(sidecar, (expired, expired))
+            fetcher = fetcher_with(cache_dir, _StubResponse(304))
+            data = fetcher._get_json("test:pricing", url)
+            sent = fetcher.session.requests[0][1] if fetcher.session.requests else {}
+            if (data == body_v1 and fetcher.hits == 1 and fetcher.misses == 0
+                    and sent.get("If-None-Match") == '"v1"'
+                    and sent.get("If-Modified-Since") == validators["Last-Modified"]
+                    and os.path.getmtime(sidecar) > expired + 3600):
+                print("PASSED Expired sidecar revalidated with a conditional GET; 304 refreshed its mtime")
+            else:
+                print(f"FAILED 304 revalidation: data {data}, headers sent {sent}")
+                ok = False
+
+            # Expired and changed: 200 replaces the sidecar body
+            os.utime(sidecar, (expired, expired))
+            fetcher = fetcher_with(cache_dir, _StubResponse(200, body_v2, {"ETag": '"v2"'}))
+            data = fetcher._get_json("test:pricing", url)
+            with open(sidecar) as f:
+                stored = json.load(f)
+            if data == body_v2 and stored["body"] == body_v2 and stored["etag"] == '"v2"':
+                print("PASSED Expired sidecar replaced when the document changed")
+            else:
+                print(f"FAILED Changed document: data {data}, sidecar {stored}")
+                ok = False
+
+            # Corrupt sidecar: ignored, unconditional live fetch
+            with open(sidecar, "w") as f:
+                f.write("{not json")
+            fetcher = fetcher_with(cache_dir, _StubResponse(200, body_v1, validators))
+            data = fetcher._get_json("test:pricing", url)
+            sent = fetcher.session.requests[0][1] if fetcher.session.requests else None
+            if data == body_v1 and fetcher.misses == 1 and sent == {}:
+                print("PASSED Corrupt sidecar fell back to a live fetch")
+            else:
+                print(f"FAILED Corrupt sidecar: data {data}, headers sent {sent}")
+                ok = False
+        return ok
+    except Exception as e:
+        print(f"FAILED Cached pricing fetcher test failed: {e}")
+        return False
+
+
+def main():
+    """Run all tests"""
+    print("TESTING Cloud Rosetta Pricing Fetcher Tests")
+    print("==========================================")
+
+    tests = [
+        test_retry_policy,
+        test_cached_pricing_fetcher,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        print(f"\n--- Running {test.__name__} ---")
+        try:
+            if test():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"FAILED Test {test.__name__} crashed: {e}")
+            failed += 1
+
+    print(f"\nTEST RESULTS:")
+    print(f"PASSED: {passed}")
+    print(f"FAILED: {failed}")
+    print(f"SUCCESS RATE: {passed/(passed+failed)*100:.1f}%")
+
+    if failed == 0:
+        print("\nSUCCESS: All tests passed!")
+        return 0
+    else:
+        print(f"\nERROR: {failed} test(s) failed. Check the output above.")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
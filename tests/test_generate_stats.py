@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Unit tests for Cloud Rosetta release stats generation
+Tests the read-only database open and the stats report cache
+"""
+
+import os
+import sys
+import shutil
+import sqlite3
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+# Add scripts directory to path
+repo_dir = Path(__file__).parent.parent
+script_dir = repo_dir / 'scripts'
+sys.path.insert(0, str(script_dir))
+
+SHIPPED_DB = repo_dir / 'db' / 'cloud_rosetta.db'
+
+
+def _copy_shipped_db(tmp_dir: str, name: str = "cloud_rosetta.db") -> str:
+    """Copy the shipped database so tests never touch the tracked file"""
+    path = Path(tmp_dir) / name
+    shutil.copy(SHIPPED_DB, path)
+    return str(path)
+
+
+def test_read_only_path_escaping():
+    """Test stats generation opens paths with URI metacharacters"""
+    try:
+        from generate_stats import generate_stats
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            weird_dir = Path(tmp_dir) / "we#ird%20?dir"
+            weird_dir.mkdir()
+            markdown = generate_stats(_copy_shipped_db(str(weird_dir)), use_cache=False)
+
+        if "## Instance Types: " in markdown:
+            print(f"PASSED Stats generated from {weird_dir.name}")
+            return True
+        print(f"FAILED Stats from {weird_dir.name} have no instance types section")
+        return False
+    except Exception as e:
+        print(f"FAILED Read-only path test failed: {e}")
+        return False
+
+
+class _FixedClock:
+    """Stand-in for generate_stats.datetime with a settable now()"""
+    current = datetime(2030, 1, 2, 3, 4, 5)
+
+    @classmethod
+    def now(cls):
+        return cls.current
+
+
+def test_stats_cache():
+    """Test cache hits reuse the report body but always print a fresh Generated line"""
+    import generate_stats as gs
+    real_datetime = gs.datetime
+    gs.datetime = _FixedClock
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = _copy_shipped_db(tmp_dir)
+            cache_path = Path(tmp_dir) / gs.STATS_CACHE_NAME
+            ok = True
+
+            # Miss: report built from the database, body saved without the Generated line
+            first = gs.generate_stats(db_path)
+            cached = cache_path.read_text() if cache_path.exists() else ""
+            if "**Generated:** 2030-01-02 03:04:05" in first and cache_path.exists() \
+                    and "**Generated:**" not in cached:
+                print("PASSED Cache miss writes the report body to the cache")
+            else:
+                print("FAILED Cache miss did not write a body-only cache")
+                ok = False
+
+            # Hit: mark the cached body so a reuse is visible, then move the clock on
+            header, _ = cached.split("\n", 1)
+            cache_path.write_text(f"{header}\nCACHED BODY\n")
+            _FixedClock.current = datetime(2031, 6, 7, 8, 9, 10)
+            hit = gs.generate_stats(db_path)
+            if "CACHED BODY" in hit and "**Generated:** 2031-06-07 08:09:10" in hit:
+                print("PASSED Cache hit reuses the body with a current Generated line")
+            else:
+                print("FAILED Cache hit did not reuse the body with a current Generated line")
+                ok = False
+
+            # A new mtime invalidates the cache
+            st = os.stat(db_path)
+            os.utime(db_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+            if "CACHED BODY" not in gs.generate_stats(db_path):
+                print("PASSED Changed mtime regenerates the report")
+            else:
+                print("FAILED Changed mtime still served the cached report")
+                ok = False
+
+            # A new size with the mtime put back also invalidates the cache
+            header, _ = cache_path.read_text().split("\n", 1)
+            cache_path.write_text(f"{header}\nCACHED BODY\n")
+            st = os.stat(db_path)
+            conn = sqlite3.connect(db_path)
+            conn.execute("CREATE TABLE padding (data BLOB)")
+            conn.execute("INSERT INTO padding VALUES (zeroblob(65536))")
+            conn.commit()
+            conn.close()
+            os.utime(db_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+            if os.stat(db_path).st_size != st.st_size and "CACHED BODY" not in gs.generate_stats(db_path):
+                print("PASSED Changed size regenerates the report")
+            else:
+                print("FAILED Changed size still served the cached report")
+                ok = False
+
+            # use_cache=False never reads the cache
+            header, _ = cache_path.read_text().split("\n", 1)
+            cache_path.write_text(f"{header}\nCACHED BODY\n")
+            if "CACHED BODY" not in gs.generate_stats(db_path, use_cache=False):
+                print("PASSED use_cache=False bypasses the cache")
+            else:
+                print("FAILED use_cache=False served the cached report")
+                ok = False
+        return ok
+    except Exception as e:
+        print(f"FAILED Stats cache test failed: {e}")
+        return False
+    finally:
+        gs.datetime = real_datetime
+
+
+def main():
+    """Run all tests"""
+    print("TESTING Cloud Rosetta Stats Generation Tests")
+    print("===========================================")
+
+    tests = [
+        test_read_only_path_escaping,
+        test_stats_cache,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        print(f"\n--- Running {test.__name__} ---")
+        try:
+            if test():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"FAILED Test {test.__name__} crashed: {e}")
+            failed += 1
+
+    print(f"\nTEST RESULTS:")
+    print(f"PASSED: {passed}")
+    print(f"FAILED: {failed}")
+    print(f"SUCCESS RATE: {passed/(passed+failed)*100:.1f}%")
+
+    if failed == 0:
+        print("\nSUCCESS: All tests passed!")
+        return 0
+    else:
+        print(f"\nERROR: {failed} test(s) failed. Check the output above.")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
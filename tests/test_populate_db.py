@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Unit tests for Cloud Rosetta database population
+Tests that populate_db skips unchanged seed data and rebuilds on --force,
+and that both populators fill network_mbps
+"""
+
+import sys
+import shutil
+import sqlite3
+import subprocess
+import tempfile
+from pathlib import Path
+
+# Add scripts directory to path
+repo_dir = Path(__file__).parent.parent
+script_dir = repo_dir / 'scripts'
+sys.path.insert(0, str(script_dir))
+
+
+def _populate(cwd: str, *args: str, script: Path = script_dir / 'populate_db.py') -> str:
+    """Run populate_db.py in cwd, so it builds cwd/db/cloud_rosetta.db; return its stdout"""
+    proc = subprocess.run([sys.executable, str(script), *args], cwd=cwd,
+                          capture_output=True, text=True, check=True)
+    return proc.stdout
+
+
+def _query(db_path: Path, sql: str) -> list:
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(sql).fetchall()
+    conn.close()
+    return rows
+
+
+def _version_rows(db_path: Path) -> list:
+    return _query(db_path, "SELECT id, notes FROM db_version ORDER BY id")
+
+
+def test_populate_skips_unchanged_seed():
+    """Test a second run is a no-op, --force rebuilds and a seed edit rebuilds"""
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = Path(tmp_dir) / 'db' / 'cloud_rosetta.db'
+            ok = True
+
+            def check(label: str, output: str, populated: bool, version_rows: int):
+                nonlocal ok
+                rows = _version_rows(db_path)
+                if (("Database population complete" in output) == populated
+                        and ("nothing to populate" in output) != populated
+                        and len(rows) == version_rows):
+                    print(f"PASSED {label}: {len(rows)} version row(s), latest {rows[-1][1]!r}")
+                else:
+                    print(f"FAILED {label}: {len(rows)} version rows, output {output.strip()!r}")
+                    ok = False
+
+            check("First run populates", _populate(tmp_dir), True, 1)
+            mappings = _query(db_path, "SELECT COUNT(*) FROM resource_mappings")[0][0]
+            check("Unchanged seed is skipped", _populate(tmp_dir), False, 1)
+            check("--force repopulates", _populate(tmp_dir, "--force"), True, 2)
+            again = _query(db_path, "SELECT COUNT(*) FROM resource_mappings")[0][0]
+            if again == mappings:
+                print(f"PASSED --force run left {again} resource mappings, no duplicates")
+            else:
+                print(f"FAILED --force run changed resource mappings from {mappings} to {again}")
+                ok = False
+            check("Still up to date after --force", _populate(tmp_dir), False, 2)
+
+            # An edited seed file changes the fingerprint, so the next run rebuilds
+            copy_dir = Path(tmp_dir) / 'scripts'
+            shutil.copytree(script_dir / 'data', copy_dir / 'data')
+            shutil.copy(script_dir / 'populate_db.py', copy_dir / 'populate_db.py')
+            with open(copy_dir / 'data' / 'regions.json', 'a') as f:
+                f.write("\n")
+            check("Edited seed repopulates", _populate(tmp_dir, script=copy_dir / 'populate_db.py'), True, 3)
+
+            rows = _version_rows(db_path)
+            if rows[0][1] == rows[1][1] != rows[2][1]:
+                print("PASSED Seed fingerprint recorded with each version row")
+            else:
+                print(f"FAILED Seed fingerprints in version rows: {[notes for _, notes in rows]}")
+                ok = False
+        return ok
+    except Exception as e:
+        print(f"FAILED Populate skip test failed: {e}")
+        return False
+
+
+def test_network_mbps_for_every_provider():
+    """Test both populators fill network_mbps, including on a database without the column"""
+    try:
+        from populate_db import _NETWORK_MBPS
+
+        ok = True
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = Path(tmp_dir) / 'db' / 'cloud_rosetta.db'
+
+            # Fresh build, then the Azure/GCP pass on top
+            _populate(tmp_dir)
+            _populate(tmp_dir, script=script_dir / 'populate_azure_gcp.py')
+            rows = _query(db_path, "SELECT provider, network_performance, network_mbps FROM instance_types")
+            wrong = [row for row in rows if row[2] != _NETWORK_MBPS.get(row[1])]
+            providers = sorted({provider for provider, _, mbps in rows if mbps is not None})
+            if not wrong and {"azure", "gcp"} <= set(providers):
+                print(f"PASSED network_mbps matches network_performance for {len(rows)} instances of {providers}")
+            else:
+                print(f"FAILED network_mbps: {len(wrong)} wrong rows, e.g. {wrong[:3]}; providers {providers}")
+                ok = False
+
+            # The shipped database predates the column; the Azure/GCP pass adds it
+            db_path.unlink()
+            shutil.copy(repo_dir / 'db' / 'cloud_rosetta.db', db_path)
+            _populate(tmp_dir, script=script_dir / 'populate_azure_gcp.py')
+            high = _query(db_path, """
+                SELECT DISTINCT network_mbps FROM instance_types
+                WHERE provider IN ('azure', 'gcp') AND network_performance = 'high'
+            """)
+            if high == [(5000,)]:
+                print("PASSED Azure/GCP pass adds network_mbps to an older database")
+            else:
+                print(f"FAILED Azure/GCP 'high' rows on an older database: {high}")
+                ok = False
+        return ok
+    except Exception as e:
+        print(f"FAILED network_mbps test failed: {e}")
+        return False
+
+
+def main():
+    """Run all tests"""
+    print("TESTING Cloud Rosetta Database Population Tests")
+    print("==============================================")
+
+    tests = [
+        test_populate_skips_unchanged_seed,
+        test_network_mbps_for_every_provider,
+    ]
+
+    passed = 0
+    failed = 0
+
+    for test in tests:
+        print(f"\n--- Running {test.__name__} ---")
+        try:
+            if test():
+                passed += 1
+            else:
+                failed += 1
+        except Exception as e:
+            print(f"FAILED Test {test.__name__} crashed: {e}")
+            failed += 1
+
+    print(f"\nTEST RESULTS:")
+    print(f"PASSED: {passed}")
+    print(f"FAILED: {failed}")
+    print(f"SUCCESS RATE: {passed/(passed+failed)*100:.1f}%")
+
+    if failed == 0:
+        print("\nSUCCESS: All tests passed!")
+        return 0
+    else:
+        print(f"\nERROR: {failed} test(s) failed. Check the output above.")
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())